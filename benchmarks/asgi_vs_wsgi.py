@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark WSGI vs ASGI en /api/api/tmdb/detalle/<id>/ contra un stub de TMDb.
+
+Levanta un stub de TMDb con latencia fija y, por turnos, el proyecto con los
+mismos comandos que el Dockerfile (gunicorn sync y gunicorn + UvicornWorker).
+Cada cliente pide ids aleatorios (siempre miss de cache, siempre una llamada
+a TMDb) durante `--duracion` segundos. Imprime peticiones/s, p50, p99 y
+errores por modo y cantidad de clientes. Los límites por usuario/IP se
+desactivan (LIMITES_ACTIVOS=False): aquí se mide el servidor, no el 429.
+
+Necesita Postgres y Redis configurados como en el despliegue (DATABASE_URL,
+REDIS_URL) y las dependencias de requirements.txt.
+Ejecutar desde la raíz del repositorio:
+    python benchmarks/asgi_vs_wsgi.py --clientes 50,200,1000 --duracion 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+RUTA = "/api/api/tmdb/detalle/{}/"
+PUERTO_STUB = 8901
+PUERTO_APP = 8902
+
+
+# ============================
+# Stub de TMDb (app ASGI mínima)
+# ============================
+
+async def tmdb_stub(scope, receive, send):
+    """GET /movie/<id>: detalle falso tras STUB_LATENCIA segundos."""
+    if scope["type"] != "http":
+        return
+    await asyncio.sleep(float(os.environ.get("STUB_LATENCIA", "0.1")))
+    movie_id = scope["path"].rstrip("/").rsplit("/", 1)[-1]
+    cuerpo = json.dumps({
+        "id": int(movie_id) if movie_id.isdigit() else 0,
+        "title": f"Película {movie_id}",
+        "overview": "",
+        "release_date": "2020-01-01",
+        "runtime": 100,
+        "genres": [{"id": 18, "name": "Drama"}],
+        "credits": {"cast": [], "crew": [{"name": "Alguien", "job": "Director"}]},
+    }).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/json")],
+    })
+    await send({"type": "http.response.body", "body": cuerpo})
+
+
+# ============================
+# Servidores
+# ============================
+
+def _arrancar(comando, env, puerto):
+    proceso = subprocess.Popen(comando, env=env)
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        try:
+            httpx.get(f"http://127.0.0.1:{puerto}/", timeout=1)
+            return proceso
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proceso.terminate()
+    raise RuntimeError(f"{comando[0]} no respondió en el puerto {puerto}")
+
+
+def _parar(proceso):
+    proceso.terminate()
+    try:
+        proceso.wait(10)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+
+
+def _comando(modo, workers):
+    aplicacion = "cinehub_project.wsgi:application" if modo == "wsgi" else "cinehub_project.asgi:application"
+    comando = [
+        sys.executable, "-m", "gunicorn", aplicacion,
+        "--bind", f"127.0.0.1:{PUERTO_APP}", "--workers", str(workers), "--timeout", "120",
+    ]
+    if modo == "asgi":
+        comando += ["-k", "uvicorn.workers.UvicornWorker"]
+    return comando
+
+
+# ============================
+# Carga
+# ============================
+
+async def _cliente(http, fin, latencias, errores):
+    while time.monotonic() < fin:
+        inicio = time.perf_counter()
+        try:
+            res = await http.get(RUTA.format(random.randint(1, 10_000_000)))
+        except httpx.HTTPError:
+            errores.append("red")
+            continue
+        if res.status_code == 200:
+            latencias.append(time.perf_counter() - inicio)
+        else:
+            errores.append(res.status_code)
+
+
+async def _carga(clientes, duracion):
+    latencias, errores = [], []
+    limites = httpx.Limits(max_connections=clientes, max_keepalive_connections=clientes)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PUERTO_APP}", limits=limites, timeout=60) as http:
+        fin = time.monotonic() + duracion
+        await asyncio.gather(*(_cliente(http, fin, latencias, errores) for _ in range(clientes)))
+    return latencias, errores
+
+
+def _percentil(valores, p):
+    if not valores:
+        return float("nan")
+    return statistics.quantiles(valores, n=100, method="inclusive")[p - 1] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clientes", default="50,200,1000")
+    parser.add_argument("--duracion", type=float, default=20)
+    parser.add_argument("--latencia", type=float, default=0.1, help="latencia del stub de TMDb (s)")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--modos", default="wsgi,asgi")
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "STUB_LATENCIA": str(args.latencia),
+        "TMDB_BASE_URL": f"http://127.0.0.1:{PUERTO_STUB}",
+        "TMDB_API_KEY": os.environ.get("TMDB_API_KEY", "benchmark"),
+        "LIMITES_ACTIVOS": "False",
+    }
+    stub = _arrancar(
+        [sys.executable, "-m", "uvicorn", "benchmarks.asgi_vs_wsgi:tmdb_stub",
+         "--port", str(PUERTO_STUB), "--log-level", "warning", "--no-access-log"],
+        env, PUERTO_STUB,
+    )
+    try:
+        print(f"{'modo':<6}{'clientes':>9}{'pet/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errores':>9}")
+        for modo in args.modos.split(","):
+            servidor = _arrancar(
+                _comando(modo, args.workers), {**env, "CINEHUB_ASGI": str(modo == "asgi")}, PUERTO_APP
+            )
+            try:
+                for clientes in (int(c) for c in args.clientes.split(",")):
+                    latencias, errores = asyncio.run(_carga(clientes, args.duracion))
+                    print(
+                        f"{modo:<6}{clientes:>9}{len(latencias) / args.duracion:>10.1f}"
+                        f"{_percentil(latencias, 50):>10.1f}{_percentil(latencias, 99):>10.1f}{len(errores):>9}"
+                    )
+            finally:
+                _parar(servidor)
+    finally:
+        _parar(stub)
+
+
+if __name__ == "__main__":
+    main()
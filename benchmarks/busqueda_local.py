@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la búsqueda local (cineapp/busqueda.py) sobre un catálogo generado.
+
+Inserta `--peliculas` películas sintéticas (tmdb_id desde BASE_TMDB_ID, títulos
+y descripciones con palabras de frecuencia tipo Zipf), mide la latencia de
+buscar_local para un término muy común, uno raro, dos palabras y uno con
+errores de tipeo (camino trigram), en la primera y la última página servida,
+e imprime p50/p95 y la cantidad de consultas SQL. Con --explain muestra además
+el plan de la consulta de candidatos.
+
+Necesita Postgres con pg_trgm (migración 0003). Ejecutar desde la raíz:
+    python benchmarks/busqueda_local.py --peliculas 200000
+    python benchmarks/busqueda_local.py --limpiar
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cinehub_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.postgres.search import SearchQuery  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from cineapp import busqueda  # noqa: E402
+from cineapp.models import Pelicula  # noqa: E402
+
+BASE_TMDB_ID = 2_000_000_000
+# Palabras con nombre al principio (las más frecuentes) y una cola larga de
+# términos sintéticos; la frecuencia de cada una es ~1/rango (Zipf)
+VOCABULARIO = [
+    "amor", "guerra", "noche", "ciudad", "sombra", "regreso", "misterio", "corazón", "fuego",
+    "silencio", "viaje", "destino", "hermano", "reina", "tormenta", "secreto", "frontera",
+    "invierno", "venganza", "espejo", "laberinto", "horizonte", "relámpago", "naufragio",
+    *(f"termino{n}" for n in range(5000)),
+]
+PESOS = [1 / (rango + 1) for rango in range(len(VOCABULARIO))]
+
+
+def _palabras(rnd, cantidad):
+    return rnd.choices(VOCABULARIO, weights=PESOS, k=cantidad)
+
+
+def generar(cantidad, semilla=42):
+    rnd = random.Random(semilla)
+    existentes = Pelicula.objects.filter(tmdb_id__gte=BASE_TMDB_ID).count()
+    lote = []
+    for i in range(existentes, cantidad):
+        lote.append(Pelicula(
+            tmdb_id=BASE_TMDB_ID + i,
+            titulo=" ".join(_palabras(rnd, rnd.randint(1, 4))).capitalize(),
+            descripcion=" ".join(_palabras(rnd, 25)),
+            popularidad=rnd.expovariate(1 / 20),
+            vote_average=round(rnd.uniform(1, 9), 1),
+        ))
+        if len(lote) == 5000:
+            Pelicula.objects.bulk_create(lote)
+            lote = []
+    Pelicula.objects.bulk_create(lote)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE cineapp_pelicula")
+
+
+def limpiar():
+    borradas, _ = Pelicula.objects.filter(tmdb_id__gte=BASE_TMDB_ID).delete()
+    print(f"{borradas} filas borradas")
+
+
+def medir(query, page, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            peliculas, total = busqueda.buscar_local(query, page)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    percentil_95 = statistics.quantiles(tiempos, n=20)[-1] if len(tiempos) > 1 else tiempos[0]
+    return statistics.median(tiempos), percentil_95, len(consultas), total, len(peliculas)
+
+
+def explicar(query):
+    consulta = SearchQuery(query, config="spanish", search_type="websearch")
+    candidatos = (
+        busqueda._coincidencias(query, consulta)
+        .order_by("-popularidad")
+        .values_list("pk", flat=True)[:settings.BUSQUEDA_LOCAL_CANDIDATOS]
+    )
+    print(candidatos.explain(analyze=True, buffers=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--peliculas", type=int, default=100_000)
+    parser.add_argument("--repeticiones", type=int, default=30)
+    parser.add_argument("--explain", action="store_true")
+    parser.add_argument("--limpiar", action="store_true", help="borra las películas generadas y sale")
+    args = parser.parse_args()
+
+    if args.limpiar:
+        limpiar()
+        return
+    generar(args.peliculas)
+
+    consultas = {
+        "común": VOCABULARIO[0],
+        "rara": "termino4000",
+        "dos palabras": f"{VOCABULARIO[1]} {VOCABULARIO[5]}",
+        "tipeo": "laberimto",
+    }
+    print(f"{'consulta':<14}{'página':>7}{'p50 ms':>9}{'p95 ms':>9}{'SQL':>5}{'total':>9}{'filas':>7}")
+    for nombre, query in consultas.items():
+        _, total = busqueda.buscar_local(query, 1)
+        ultima = max(1, busqueda.paginas(total))
+        for page in sorted({1, ultima}):
+            p50, p95, sql, total, filas = medir(query, page, args.repeticiones)
+            print(f"{nombre:<14}{page:>7}{p50:>9.1f}{p95:>9.1f}{sql:>5}{total:>9}{filas:>7}")
+        if args.explain:
+            explicar(query)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los listados de favoritos y vistos con `--filas` filas por usuario.
+
+Genera `--usuarios` usuarios con `--filas` Visto y Favorito cada uno y mide,
+sobre el primero, la primera página, una página profunda (siguiendo el cursor
+hasta la página `--profundidad`), la misma posición con OFFSET (lo que se
+reemplazó) y ?solo_ids=1. Imprime p50 en ms y filas devueltas.
+
+Necesita PostgreSQL (DATABASE_URL). Ejecutar desde la raíz:
+    python benchmarks/listados.py --filas 10000
+    python benchmarks/listados.py --limpiar
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cinehub_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.test import APIRequestFactory, force_authenticate  # noqa: E402
+
+from cineapp import views  # noqa: E402
+from cineapp.models import Favorito, Pelicula, Usuario, Visto  # noqa: E402
+
+BASE_TMDB_ID = 2_100_000_000
+DOMINIO = "@benchmark-listados.test"
+
+
+def generar(usuarios, filas, semilla=7):
+    rnd = random.Random(semilla)
+    existentes = Pelicula.objects.filter(tmdb_id__gte=BASE_TMDB_ID).count()
+    Pelicula.objects.bulk_create(
+        (Pelicula(tmdb_id=BASE_TMDB_ID + i, titulo=f"Película {i}") for i in range(existentes, filas)),
+        batch_size=5000,
+    )
+    peliculas = list(
+        Pelicula.objects.filter(tmdb_id__gte=BASE_TMDB_ID).order_by("tmdb_id").values_list("pk", flat=True)[:filas]
+    )
+    ahora = timezone.now()
+    for n in range(usuarios):
+        usuario, creado = Usuario.objects.get_or_create(email=f"u{n}{DOMINIO}", defaults={"nombre": f"u{n}"})
+        if not creado:
+            continue
+        orden = rnd.sample(peliculas, len(peliculas))
+        Visto.objects.bulk_create(
+            (Visto(usuario=usuario, pelicula_id=p) for p in orden), batch_size=5000
+        )
+        Favorito.objects.bulk_create(
+            (Favorito(usuario=usuario, pelicula_id=p) for p in orden), batch_size=5000
+        )
+        # fecha_visto repartida en un año, con empates como en datos reales
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {Visto._meta.db_table} SET fecha_visto = %s - (random() * 365 * 24)::int * interval '1 hour' "
+                "WHERE usuario_id = %s",
+                [ahora, usuario.pk],
+            )
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {Visto._meta.db_table}")
+        cursor.execute(f"ANALYZE {Favorito._meta.db_table}")
+
+
+def limpiar():
+    Usuario.objects.filter(email__endswith=DOMINIO).delete()
+    borradas, _ = Pelicula.objects.filter(tmdb_id__gte=BASE_TMDB_ID).delete()
+    print(f"{borradas} filas borradas")
+
+
+def _get(vista, usuario, params):
+    peticion = APIRequestFactory().get("/", params)
+    force_authenticate(peticion, user=usuario)
+    respuesta = vista(peticion)
+    assert respuesta.status_code == 200, respuesta.status_code
+    return respuesta.data
+
+
+def _medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--usuarios", type=int, default=20)
+    parser.add_argument("--filas", type=int, default=10_000)
+    parser.add_argument("--tamano", type=int, default=50)
+    parser.add_argument("--profundidad", type=int, default=150)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--limpiar", action="store_true", help="borra los datos generados y sale")
+    args = parser.parse_args()
+
+    if args.limpiar:
+        limpiar()
+        return
+    generar(args.usuarios, args.filas)
+    usuario = Usuario.objects.get(email=f"u0{DOMINIO}")
+
+    print(f"{'listado':<10}{'caso':<22}{'p50 ms':>9}{'filas':>8}")
+    for nombre, vista, modelo, orden in (
+        ("vistos", views.vistos, Visto, ("-fecha_visto", "-id")),
+        ("favoritos", views.favoritos, Favorito, ("-id",)),
+    ):
+        ms, datos = _medir(lambda: _get(vista, usuario, {"page_size": args.tamano}), args.repeticiones)
+        print(f"{nombre:<10}{'primera página':<22}{ms:>9.1f}{len(datos['results']):>8}")
+
+        cursor = datos["next"]
+        for _ in range(args.profundidad - 2):
+            cursor = _get(vista, usuario, {"page_size": args.tamano, "cursor": cursor})["next"]
+        ms, datos = _medir(
+            lambda: _get(vista, usuario, {"page_size": args.tamano, "cursor": cursor}), args.repeticiones
+        )
+        print(f"{nombre:<10}{f'página {args.profundidad} (cursor)':<22}{ms:>9.1f}{len(datos['results']):>8}")
+
+        desde = (args.profundidad - 1) * args.tamano
+        offset = (
+            modelo.objects.filter(usuario=usuario).select_related("pelicula")
+            .only("id", *views.CAMPOS_PELICULA_RELACIONADA).order_by(*orden)
+        )
+        ms, filas = _medir(lambda: list(offset[desde:desde + args.tamano]), args.repeticiones)
+        print(f"{nombre:<10}{f'página {args.profundidad} (OFFSET)':<22}{ms:>9.1f}{len(filas):>8}")
+
+        ms, datos = _medir(lambda: _get(vista, usuario, {"solo_ids": "1"}), args.repeticiones)
+        print(f"{nombre:<10}{'solo_ids=1':<22}{ms:>9.1f}{len(datos['results']):>8}")
+
+
+if __name__ == "__main__":
+    main()
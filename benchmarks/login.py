@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark de LoginView (/api/auth/login/): logins por segundo y hashes por login.
+
+Crea un usuario temporal y mide, con el hasher configurado (PBKDF2 por
+defecto), un login correcto, uno con contraseña incorrecta y uno con un email
+inexistente. Compara cada uno con el costo de un solo hash
+(check_password): el cociente debe rondar 1 en los tres casos. Los límites de
+peticiones se desactivan para medir solo la vista.
+
+Necesita la base de datos configurada (DATABASE_URL). Ejecutar desde la raíz:
+    python benchmarks/login.py --repeticiones 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cinehub_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.hashers import check_password, make_password  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from cineapp.models import Usuario  # noqa: E402
+from cineapp.views_auth import LoginView  # noqa: E402
+
+EMAIL = "benchmark-login@cinehub.test"
+PASSWORD = "benchmark-login"
+
+
+def _medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    fabrica = APIRequestFactory()
+    vista = LoginView.as_view()
+
+    def login(email, password, esperado):
+        def hacer():
+            respuesta = vista(fabrica.post("/api/auth/login/", {"email": email, "password": password}))
+            assert respuesta.status_code == esperado, respuesta.status_code
+        return hacer
+
+    codificada = make_password(PASSWORD)
+    hash_ms = _medir(lambda: check_password(PASSWORD, codificada), args.repeticiones)
+
+    Usuario.objects.filter(email=EMAIL).delete()
+    Usuario.objects.create_user(email=EMAIL, password=PASSWORD)
+    casos = {
+        "correcto": login(EMAIL, PASSWORD, 200),
+        "contraseña mala": login(EMAIL, "otra", 401),
+        "email inexistente": login("nadie-" + EMAIL, PASSWORD, 401),
+    }
+    try:
+        with override_settings(LIMITES_ACTIVOS=False):
+            print(f"un hash: {hash_ms:.1f} ms")
+            print(f"{'caso':<20}{'ms/login':>10}{'logins/s':>10}{'hashes':>8}")
+            for nombre, hacer in casos.items():
+                hacer()  # calienta conexiones y caches
+                ms = _medir(hacer, args.repeticiones)
+                print(f"{nombre:<20}{ms:>10.1f}{1000 / ms:>10.1f}{ms / hash_ms:>8.2f}")
+    finally:
+        Usuario.objects.filter(email=EMAIL).delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark de procesar_vencidas (python manage.py procesar_suscripciones).
+
+Genera `--suscripciones` suscripciones activas vencidas (una por usuario; la
+mitad con renovación automática) y las procesa con 1 y con `--workers`
+procesos a la vez, cada uno con su conexión. Imprime segundos,
+suscripciones/s, renovadas, expiradas y pagos registrados: con varios
+workers la suma debe coincidir con el total (SKIP LOCKED reparte las filas,
+ninguna se procesa dos veces).
+
+Necesita PostgreSQL (DATABASE_URL). Ejecutar desde la raíz:
+    python benchmarks/suscripciones.py --suscripciones 50000 --workers 4
+    python benchmarks/suscripciones.py --limpiar
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cinehub_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connections  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from cineapp import suscripciones  # noqa: E402
+from cineapp.models import HistorialPago, PlanSuscripcion, Suscripcion, Usuario  # noqa: E402
+
+DOMINIO = "@benchmark-suscripciones.test"
+
+
+def generar(cantidad):
+    plan = PlanSuscripcion.objects.filter(es_activo=True).first() or PlanSuscripcion.objects.create(
+        nombre="Benchmark", tipo="basico", precio_mensual="9.99", descripcion=""
+    )
+    existentes = Usuario.objects.filter(email__endswith=DOMINIO).count()
+    Usuario.objects.bulk_create(
+        (Usuario(email=f"u{i}{DOMINIO}") for i in range(existentes, cantidad)), batch_size=5000
+    )
+    # Vuelve a dejar todo vencido: cada corrida parte del mismo estado
+    usuarios = Usuario.objects.filter(email__endswith=DOMINIO)
+    HistorialPago.objects.filter(suscripcion__usuario__in=usuarios).delete()
+    Suscripcion.objects.filter(usuario__in=usuarios).delete()
+    vencimiento = timezone.now() - suscripciones.DURACION_PERIODO
+    Suscripcion.objects.bulk_create(
+        (
+            Suscripcion(usuario_id=pk, plan=plan, fecha_fin=vencimiento, es_renovacion_automatica=pk % 2 == 0)
+            for pk in usuarios.values_list("pk", flat=True).iterator()
+        ),
+        batch_size=5000,
+    )
+
+
+def limpiar():
+    usuarios = Usuario.objects.filter(email__endswith=DOMINIO)
+    HistorialPago.objects.filter(suscripcion__usuario__in=usuarios).delete()
+    borradas, _ = usuarios.delete()
+    borradas += PlanSuscripcion.objects.filter(nombre="Benchmark", suscripcion__isnull=True).delete()[0]
+    print(f"{borradas} filas borradas")
+
+
+def _worker(args):
+    lote, inicio = args
+    connections.close_all()  # conexión propia, no la heredada del padre
+    while time.time() < inicio:
+        time.sleep(0.001)
+    resultado = suscripciones.procesar_vencidas(lote=lote)
+    return resultado, time.time()
+
+
+def _correr(workers, lote):
+    """Arranca todos los workers en el mismo instante; segundos hasta que termina el último."""
+    inicio = time.time() + 1
+    with multiprocessing.Pool(workers) as pool:
+        salidas = pool.map(_worker, [(lote, inicio)] * workers)
+    return max(fin for _, fin in salidas) - inicio, [resultado for resultado, _ in salidas]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--suscripciones", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--lote", type=int, default=1000)
+    parser.add_argument("--limpiar", action="store_true", help="borra los datos generados y sale")
+    args = parser.parse_args()
+
+    if args.limpiar:
+        limpiar()
+        return
+
+    print(f"{'workers':>8}{'s':>9}{'susc/s':>10}{'renovadas':>11}{'expiradas':>11}{'pagos':>8}")
+    for workers in sorted({1, args.workers}):
+        generar(args.suscripciones)
+        connections.close_all()
+        segundos, resultados = _correr(workers, args.lote)
+        renovadas = sum(r for r, _ in resultados)
+        expiradas = sum(e for _, e in resultados)
+        pagos = HistorialPago.objects.filter(suscripcion__usuario__email__endswith=DOMINIO).count()
+        print(
+            f"{workers:>8}{segundos:>9.2f}{(renovadas + expiradas) / segundos:>10.0f}"
+            f"{renovadas:>11}{expiradas:>11}{pagos:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
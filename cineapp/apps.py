@@ -0,0 +1,10 @@
+# cineapp/apps.py
+from django.apps import AppConfig
+
+
+class CineappConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "cineapp"
+
+    def ready(self):
+        from . import signals  # noqa: F401
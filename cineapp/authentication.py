@@ -0,0 +1,110 @@
+# cineapp/authentication.py
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from . import revocacion
+
+# ============================
+# Autenticación JWT con usuario cacheado
+# ============================
+# Igual que JWTAuthentication de simplejwt, pero el Usuario del token se busca
+# primero en un LRU del proceso (TTL de segundos), luego en Redis y solo ante un
+# fallo en Postgres. Guardar, borrar o actualizar con queryset.update() un
+# Usuario borra su entrada de Redis y del LRU de este proceso al confirmar; los
+# LRU de otros workers caducan solos por su TTL corto. Los tokens revocados (cineapp/revocacion.py) se rechazan antes
+# de buscar el usuario.
+
+_local = OrderedDict()
+_lock = threading.Lock()
+
+
+def _clave(usuario_id):
+    return f"auth_usuario_{usuario_id}"
+
+
+def _leer_local(usuario_id):
+    with _lock:
+        entrada = _local.get(usuario_id)
+        if entrada is None:
+            return None
+        usuario, expira_en = entrada
+        if expira_en < time.monotonic():
+            del _local[usuario_id]
+            return None
+        _local.move_to_end(usuario_id)
+        return usuario
+
+
+def _guardar_local(usuario_id, usuario):
+    with _lock:
+        _local[usuario_id] = (usuario, time.monotonic() + settings.AUTENTICACION_CACHE_LOCAL_TTL)
+        _local.move_to_end(usuario_id)
+        while len(_local) > settings.AUTENTICACION_CACHE_LOCAL_MAXIMO:
+            _local.popitem(last=False)
+
+
+def invalidar(*usuario_ids):
+    """Descarta los usuarios cacheados cuando la transacción en curso confirma."""
+    def borrar():
+        with _lock:
+            for usuario_id in usuario_ids:
+                _local.pop(usuario_id, None)
+        cache.delete_many([_clave(usuario_id) for usuario_id in usuario_ids])
+    if usuario_ids:
+        transaction.on_commit(borrar)
+
+
+def obtener_usuario(modelo, usuario_id):
+    """Usuario por id desde el LRU local, Redis o la base (en ese orden). None si no existe."""
+    usuario = _leer_local(usuario_id)
+    if usuario is None:
+        usuario = cache.get(_clave(usuario_id))
+        if usuario is None:
+            # Sin el hash de la contraseña: no se guarda en Redis. Si algo lo lee
+            # (p.ej. CHECK_REVOKE_TOKEN) Django lo carga de la base en ese momento.
+            usuario = modelo.objects.defer("password").filter(**{api_settings.USER_ID_FIELD: usuario_id}).first()
+            if usuario is None:
+                return None
+            cache.set(_clave(usuario_id), usuario, settings.AUTENTICACION_CACHE_TTL)
+        _guardar_local(usuario_id, usuario)
+    # Copia por petición: una vista que modifique request.user no toca la instancia cacheada
+    return copy.copy(usuario)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if revocacion.esta_revocado(validated_token):
+            raise InvalidToken({"detail": _("Token revocado"), "code": "token_revoked"})
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = obtener_usuario(self.user_model, user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
@@ -0,0 +1,122 @@
+# cineapp/autocompletado.py
+import json
+import re
+import time
+import unicodedata
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from .models import Pelicula
+
+# ============================
+# Índice de prefijos en Redis
+# ============================
+# Cada prefijo normalizado (de 2 a MAX_PREFIJO caracteres, desde el inicio del
+# título y desde el inicio de cada palabra) es un sorted set con las películas
+# más populares que lo contienen. El índice se construye en una generación nueva
+# y luego se publica cambiando CLAVE_GENERACION, así las lecturas nunca ven un
+# índice a medio construir.
+
+MIN_PREFIJO = 2
+MAX_PREFIJO = 20
+CLAVE_GENERACION = "cinehub:ac:gen"
+CLAVE_SIGUIENTE = "cinehub:ac:siguiente"
+
+_generacion = (None, 0.0)
+
+
+def normalizar(texto):
+    """Minúsculas, sin acentos y con cualquier separador reducido a un espacio."""
+    texto = unicodedata.normalize("NFKD", texto or "")
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[\W_]+", " ", texto.lower()).split())
+
+
+def prefijos(titulo):
+    palabras = normalizar(titulo).split()
+    resultado = set()
+    for i in range(len(palabras)):
+        # Al cortar en MAX_PREFIJO puede quedar un espacio al final: sugerir() recorta igual
+        sufijo = " ".join(palabras[i:])[:MAX_PREFIJO].rstrip()
+        for n in range(MIN_PREFIJO, len(sufijo) + 1):
+            if sufijo[n - 1] != " ":
+                resultado.add(sufijo[:n])
+    return resultado
+
+
+def _clave(generacion, prefijo):
+    return f"cinehub:ac:{generacion}:{prefijo}"
+
+
+def reconstruir():
+    """Reconstruye el índice completo desde Pelicula. Devuelve la cantidad de prefijos."""
+    redis = get_redis_connection("default")
+    generacion = redis.incr(CLAVE_SIGUIENTE)
+    maximo = settings.AUTOCOMPLETADO_MAX_POR_PREFIJO
+
+    # Recorriendo por popularidad descendente, los primeros `maximo` de cada
+    # prefijo ya son los mejores: no hace falta recortar los sets después.
+    ocupados = {}
+    pipe = redis.pipeline(transaction=False)
+    peliculas = (
+        Pelicula.objects.filter(tmdb_id__isnull=False)
+        .only("tmdb_id", "titulo", "poster", "fecha_lanzamiento", "popularidad")
+        .order_by("-popularidad")
+    )
+    for pelicula in peliculas.iterator(chunk_size=2000):
+        miembro = json.dumps(
+            {
+                "id": pelicula.tmdb_id,
+                "title": pelicula.titulo,
+                "poster_path": pelicula.poster,
+                "release_date": pelicula.fecha_lanzamiento.isoformat() if pelicula.fecha_lanzamiento else None,
+            },
+            separators=(",", ":"),
+        )
+        for prefijo in prefijos(pelicula.titulo):
+            if ocupados.get(prefijo, 0) >= maximo:
+                continue
+            ocupados[prefijo] = ocupados.get(prefijo, 0) + 1
+            pipe.zadd(_clave(generacion, prefijo), {miembro: pelicula.popularidad})
+        if len(pipe) >= 10000:
+            pipe.execute()
+    pipe.execute()
+
+    anterior = redis.getset(CLAVE_GENERACION, generacion)
+    if anterior is not None:
+        # La generación vieja se deja expirar para no cortar lecturas en curso
+        for clave in redis.scan_iter(match=_clave(int(anterior), "*"), count=1000):
+            pipe.expire(clave, 60)
+            if len(pipe) >= 10000:
+                pipe.execute()
+        pipe.execute()
+    return len(ocupados)
+
+
+def _generacion_actual(redis):
+    global _generacion
+    generacion, leida_en = _generacion
+    if generacion is None or time.monotonic() - leida_en > 10:
+        valor = redis.get(CLAVE_GENERACION)
+        generacion = int(valor) if valor is not None else None
+        _generacion = (generacion, time.monotonic())
+    return generacion
+
+
+def sugerir(query, limite=10):
+    """Sugerencias para `query` ordenadas por popularidad (un solo ZREVRANGE)."""
+    normal = normalizar(query)
+    if len(normal) < MIN_PREFIJO:
+        return []
+
+    redis = get_redis_connection("default")
+    generacion = _generacion_actual(redis)
+    if generacion is None:
+        return []
+
+    miembros = redis.zrevrange(_clave(generacion, normal[:MAX_PREFIJO].rstrip()), 0, limite - 1)
+    resultados = [json.loads(m) for m in miembros]
+    if len(normal) > MAX_PREFIJO:
+        resultados = [r for r in resultados if normal in normalizar(r["title"])]
+    return resultados
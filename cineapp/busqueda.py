@@ -0,0 +1,58 @@
+# cineapp/busqueda.py
+import math
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F, Q
+
+from .models import Pelicula
+
+POR_PAGINA = 20
+
+# Columnas que usa normalize_movie_from_model
+CAMPOS_LISTADO = (
+    "tmdb_id", "titulo", "descripcion", "poster", "fecha_lanzamiento", "vote_average", "genre_ids",
+)
+
+
+def paginas(total, por_pagina=POR_PAGINA):
+    """total_pages de una búsqueda local: solo se sirven las páginas de la ventana de candidatos."""
+    return math.ceil(min(total, settings.BUSQUEDA_LOCAL_CANDIDATOS) / por_pagina)
+
+
+def _coincidencias(query, consulta):
+    return Pelicula.objects.filter(
+        Q(busqueda=consulta) | Q(titulo__trigram_similar=query),
+        tmdb_id__isnull=False,
+    )
+
+
+def buscar_local(query, page=1, por_pagina=POR_PAGINA):
+    """
+    Búsqueda sobre el catálogo local: full-text en español (GIN sobre `busqueda`)
+    más similitud trigram sobre el título para tolerar errores de tipeo.
+    Devuelve las películas de la página y el total exacto de coincidencias.
+
+    Solo se rankean las BUSQUEDA_LOCAL_CANDIDATOS coincidencias más populares
+    (índice pelicula_popularidad_idx): un término muy común no obliga a
+    puntuar medio catálogo, y las páginas más allá de esa ventana no se
+    sirven (ver `paginas`).
+    """
+    consulta = SearchQuery(query, config="spanish", search_type="websearch")
+    limite = settings.BUSQUEDA_LOCAL_CANDIDATOS
+    candidatos = list(
+        _coincidencias(query, consulta).order_by("-popularidad").values_list("pk", flat=True)[:limite]
+    )
+    if not candidatos:
+        return [], 0
+    # El total solo se cuenta aparte cuando la ventana se llenó
+    total = len(candidatos) if len(candidatos) < limite else _coincidencias(query, consulta).count()
+
+    inicio = (page - 1) * por_pagina
+    peliculas = (
+        Pelicula.objects.filter(pk__in=candidatos)
+        .only(*CAMPOS_LISTADO)
+        .annotate(rank=SearchRank(F("busqueda"), consulta) + TrigramSimilarity("titulo", query))
+        .order_by("-rank", "-popularidad")[inicio:inicio + por_pagina]
+    )
+    return list(peliculas), total
@@ -0,0 +1,220 @@
+# cineapp/cache_utils.py
+import asyncio
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from . import metricas
+
+logger = logging.getLogger(__name__)
+
+# ============================
+# Respaldo (último valor bueno)
+# ============================
+# Copia de larga duración que se sirve cuando la carga falla (TMDb caído o
+# circuito abierto) y la entrada normal ya expiró.
+
+def guardar_con_respaldo(key, valor, ttl):
+    cache.set(key, valor, ttl)
+    cache.set(f"{key}:respaldo", valor, settings.CACHE_RESPALDO_TTL)
+
+
+def obtener_respaldo(key):
+    return cache.get(f"{key}:respaldo")
+
+# ============================
+# Stale-while-revalidate
+# ============================
+# Cada entrada guarda {"valor", "refrescar_en"}: el TTL de Redis es el TTL duro
+# y "refrescar_en" marca el TTL suave. Pasado el suave se sigue sirviendo el
+# valor viejo mientras un solo worker (el que gana el lock) lo refresca.
+
+def guardar_swr(key, valor, soft_ttl, hard_ttl):
+    cache.set(key, {"valor": valor, "refrescar_en": time.time() + soft_ttl}, hard_ttl)
+    cache.set(f"{key}:respaldo", valor, settings.CACHE_RESPALDO_TTL)
+
+
+def _refrescar(key, cargar, soft_ttl, hard_ttl):
+    try:
+        valor = cargar()
+        if valor is not None:
+            guardar_swr(key, valor, soft_ttl, hard_ttl)
+    except Exception:
+        logger.exception("No se pudo refrescar la entrada %s", key)
+    finally:
+        # El hilo termina aquí: con CONN_MAX_AGE close_old_connections dejaría
+        # abierta su conexión a Postgres, que nadie más va a reutilizar
+        connections.close_all()
+
+
+def obtener_swr(key, cargar, soft_ttl, hard_ttl, lock_ttl=30):
+    """
+    Devuelve el valor cacheado en `key`, refrescándolo en segundo plano si
+    superó `soft_ttl`. Solo se llama a `cargar` en primer plano cuando no hay
+    nada en cache. `cargar` devuelve None si falla y None nunca se cachea;
+    en ese caso se devuelve el respaldo, si existe.
+    """
+    entrada = cache.get(key)
+    if isinstance(entrada, dict) and "refrescar_en" in entrada:
+        if time.time() >= entrada["refrescar_en"] and cache.add(f"{key}:lock", 1, lock_ttl):
+            threading.Thread(
+                target=_refrescar, args=(key, cargar, soft_ttl, hard_ttl), daemon=True
+            ).start()
+        return entrada["valor"]
+
+    valor = cargar()
+    if valor is None:
+        return obtener_respaldo(key)
+    guardar_swr(key, valor, soft_ttl, hard_ttl)
+    return valor
+
+
+# ============================
+# Coalescencia (single-flight) entre workers
+# ============================
+# El primer miss toma un lock corto y llama a `cargar`; los misses concurrentes
+# de la misma key esperan (acotado) a que aparezca el valor en cache.
+
+def obtener_coalescido(key, cargar, ttl, lock_ttl=10, espera_max=5.0):
+    valor = cache.get(key)
+    if valor is not None:
+        return valor
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, lock_ttl):
+        metricas.incrementar_compartido("coalescencia.lider")
+        try:
+            valor = cargar()
+            if valor is not None:
+                guardar_con_respaldo(key, valor, ttl)
+        finally:
+            cache.delete(lock_key)
+        return valor if valor is not None else obtener_respaldo(key)
+
+    limite = time.monotonic() + espera_max
+    intervalo = 0.025
+    while time.monotonic() < limite:
+        time.sleep(intervalo)
+        intervalo = min(intervalo * 2, 0.2)
+        encontrados = cache.get_many([key, lock_key])
+        if key in encontrados:
+            metricas.incrementar_compartido("coalescencia.coalescidas")
+            return encontrados[key]
+        if lock_key not in encontrados:
+            # El líder terminó sin valor (falló): no tiene sentido seguir esperando
+            break
+
+    metricas.incrementar_compartido("coalescencia.espera_agotada")
+    valor = cargar()
+    if valor is None:
+        return obtener_respaldo(key)
+    guardar_con_respaldo(key, valor, ttl)
+    return valor
+
+
+# ============================
+# Variantes asíncronas (vistas ASGI)
+# ============================
+# cache.aget/aset/... de Django son sync_to_async(thread_sensitive=True): todas
+# las llamadas a Redis de las peticiones en vuelo se encolan en un único hilo
+# por proceso. django-redis no tiene cliente async, así que estas van al pool
+# de hilos del event loop (el pool de conexiones de redis-py es thread-safe).
+# Solo para código que no toca la base de datos: el ORM sigue con
+# sync_to_async normal (una conexión por hilo).
+
+def en_hilo(funcion):
+    """sync_to_async(thread_sensitive=False), para funciones que solo usan Redis."""
+    return sync_to_async(funcion, thread_sensitive=False)
+
+
+class _CacheAsync:
+    """`acache.aget(k)` es `cache.get(k)` ejecutado con `en_hilo`; igual aset, aadd, ..."""
+
+    def __getattr__(self, nombre):
+        return en_hilo(getattr(cache, nombre.removeprefix("a")))
+
+
+acache = _CacheAsync()
+
+# Referencias a los refrescos en curso para que el GC no cancele las tareas
+_tareas = set()
+
+
+async def aguardar_con_respaldo(key, valor, ttl):
+    await acache.aset(key, valor, ttl)
+    await acache.aset(f"{key}:respaldo", valor, settings.CACHE_RESPALDO_TTL)
+
+
+async def aobtener_respaldo(key):
+    return await acache.aget(f"{key}:respaldo")
+
+
+async def aguardar_swr(key, valor, soft_ttl, hard_ttl):
+    await acache.aset(key, {"valor": valor, "refrescar_en": time.time() + soft_ttl}, hard_ttl)
+    await acache.aset(f"{key}:respaldo", valor, settings.CACHE_RESPALDO_TTL)
+
+
+async def _arefrescar(key, acargar, soft_ttl, hard_ttl):
+    try:
+        valor = await acargar()
+        if valor is not None:
+            await aguardar_swr(key, valor, soft_ttl, hard_ttl)
+    except Exception:
+        logger.exception("No se pudo refrescar la entrada %s", key)
+
+
+async def aobtener_swr(key, acargar, soft_ttl, hard_ttl, lock_ttl=30):
+    entrada = await acache.aget(key)
+    if isinstance(entrada, dict) and "refrescar_en" in entrada:
+        if time.time() >= entrada["refrescar_en"] and await acache.aadd(f"{key}:lock", 1, lock_ttl):
+            tarea = asyncio.create_task(_arefrescar(key, acargar, soft_ttl, hard_ttl))
+            _tareas.add(tarea)
+            tarea.add_done_callback(_tareas.discard)
+        return entrada["valor"]
+
+    valor = await acargar()
+    if valor is None:
+        return await aobtener_respaldo(key)
+    await aguardar_swr(key, valor, soft_ttl, hard_ttl)
+    return valor
+
+
+async def aobtener_coalescido(key, acargar, ttl, lock_ttl=10, espera_max=5.0):
+    valor = await acache.aget(key)
+    if valor is not None:
+        return valor
+
+    lock_key = f"{key}:lock"
+    if await acache.aadd(lock_key, 1, lock_ttl):
+        await en_hilo(metricas.incrementar_compartido)("coalescencia.lider")
+        try:
+            valor = await acargar()
+            if valor is not None:
+                await aguardar_con_respaldo(key, valor, ttl)
+        finally:
+            await acache.adelete(lock_key)
+        return valor if valor is not None else await aobtener_respaldo(key)
+
+    limite = time.monotonic() + espera_max
+    intervalo = 0.025
+    while time.monotonic() < limite:
+        await asyncio.sleep(intervalo)
+        intervalo = min(intervalo * 2, 0.2)
+        encontrados = await acache.aget_many([key, lock_key])
+        if key in encontrados:
+            await en_hilo(metricas.incrementar_compartido)("coalescencia.coalescidas")
+            return encontrados[key]
+        if lock_key not in encontrados:
+            break
+
+    await en_hilo(metricas.incrementar_compartido)("coalescencia.espera_agotada")
+    valor = await acargar()
+    if valor is None:
+        return await aobtener_respaldo(key)
+    await aguardar_con_respaldo(key, valor, ttl)
+    return valor
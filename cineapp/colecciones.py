@@ -0,0 +1,245 @@
+# cineapp/colecciones.py
+import json
+
+from django.db import connection, transaction
+from django.utils.dateparse import parse_date
+
+from . import estadisticas
+from .models import EstadisticasUsuario, Favorito, Pelicula, Visto
+
+# ============================
+# Favoritos / Vistos en lote
+# ============================
+# Altas y bajas masivas (p.ej. importar el historial de otro servicio) con un
+# número fijo de sentencias, sin importar cuántos títulos traiga la petición.
+# Las señales por fila se suspenden y las estadísticas del usuario se
+# recalculan una sola vez al final.
+
+CREADO = "creado"
+EXISTENTE = "existente"
+INVALIDO = "invalido"
+
+
+def _tmdb_id(item):
+    if not isinstance(item, dict):
+        return None
+    try:
+        return int(item.get("tmdb_id") or item.get("id"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _fecha(valor):
+    try:
+        return parse_date(valor or "")
+    except (TypeError, ValueError):
+        return None
+
+
+def _pelicula_desde_payload(tmdb_id, item):
+    return Pelicula(
+        tmdb_id=tmdb_id,
+        titulo=(item.get("title") or "")[:200],
+        descripcion=item.get("overview") or "",
+        poster=item.get("poster_path"),
+        fecha_lanzamiento=_fecha(item.get("release_date")),
+    )
+
+
+def asegurar_peliculas(payloads):
+    """
+    Crea las Pelicula que falten para `payloads` ({tmdb_id: item}) y devuelve
+    {tmdb_id: pelicula_id}. Dos sentencias: INSERT ... ON CONFLICT DO NOTHING y un SELECT.
+    """
+    Pelicula.objects.bulk_create(
+        [_pelicula_desde_payload(tmdb_id, item) for tmdb_id, item in payloads.items()],
+        ignore_conflicts=True,
+    )
+    return dict(Pelicula.objects.filter(tmdb_id__in=payloads).values_list("tmdb_id", "id"))
+
+
+def agregar(modelo, usuario, items):
+    """
+    Agrega `items` (payloads de TMDb) a la colección `modelo` (Favorito o Visto)
+    del usuario. Devuelve un resultado por item, en el mismo orden:
+    {"tmdb_id", "estado": creado|existente|invalido, "id"}.
+    """
+    payloads = {}
+    for item in items:
+        tmdb_id = _tmdb_id(item)
+        if tmdb_id is not None:
+            payloads.setdefault(tmdb_id, item)
+
+    peliculas = {}
+    existentes = set()
+    ids = {}
+    if payloads:
+        with transaction.atomic(), estadisticas.suspender_estadisticas():
+            peliculas = asegurar_peliculas(payloads)
+            coleccion = modelo.objects.filter(usuario=usuario, pelicula_id__in=peliculas.values())
+            existentes = set(coleccion.values_list("pelicula_id", flat=True))
+            modelo.objects.bulk_create(
+                [modelo(usuario=usuario, pelicula_id=pid) for pid in peliculas.values() if pid not in existentes],
+                ignore_conflicts=True,
+            )
+            ids = dict(coleccion.values_list("pelicula_id", "id"))
+            estadisticas.reconstruir([usuario.pk])
+
+    resultados = []
+    vistos = set()
+    for item in items:
+        tmdb_id = _tmdb_id(item)
+        if tmdb_id is None:
+            resultados.append({"tmdb_id": None, "estado": INVALIDO, "id": None})
+            continue
+        pelicula_id = peliculas.get(tmdb_id)
+        creado = pelicula_id not in existentes and tmdb_id not in vistos
+        vistos.add(tmdb_id)
+        resultados.append({
+            "tmdb_id": tmdb_id,
+            "estado": CREADO if creado else EXISTENTE,
+            "id": ids.get(pelicula_id),
+        })
+    return resultados
+
+
+def eliminar(modelo, usuario, ids):
+    """Borra de la colección del usuario los `ids` (pk de Favorito/Visto). Devuelve (eliminados, no_encontrados)."""
+    ids = set(ids)
+    with transaction.atomic(), estadisticas.suspender_estadisticas():
+        filas = modelo.objects.filter(usuario=usuario, pk__in=ids)
+        encontrados = set(filas.values_list("pk", flat=True))
+        filas.delete()
+        estadisticas.reconstruir([usuario.pk])
+    return sorted(encontrados), sorted(ids - encontrados)
+
+
+# ============================
+# Alta individual (POST favoritos/ y vistos/)
+# ============================
+# INSERT ... ON CONFLICT DO NOTHING: idempotente ante dobles toques concurrentes
+# del cliente (sin IntegrityError) y sin escribir la fila si ya existe (ni
+# bloqueo de fila, ni tupla muerta, ni recalcular `busqueda` de la película).
+# RETURNING solo devuelve filas insertadas; la existente la trae un UNION ALL en
+# la misma sentencia. Si otra transacción la insertó mientras tanto, la
+# sentencia no la ve (misma instantánea) y se relee con un SELECT aparte. El
+# contador de EstadisticasUsuario se ajusta en la misma sentencia con un CTE,
+# solo si la fila es nueva.
+
+_COLUMNAS_PELICULA = "id, titulo, descripcion, poster, fecha_lanzamiento, vote_average, genre_ids"
+
+_SQL_PELICULA_EXISTENTE = f"""
+    SELECT {_COLUMNAS_PELICULA} FROM {Pelicula._meta.db_table} WHERE tmdb_id = %s
+"""
+
+_SQL_PELICULA = f"""
+    WITH nueva AS (
+        INSERT INTO {Pelicula._meta.db_table} (
+            tmdb_id, titulo, descripcion, poster, fecha_lanzamiento,
+            vote_average, genre_ids, popularidad, en_cartelera
+        )
+        VALUES (%s, %s, %s, %s, %s, 0, '[]'::jsonb, 0, false)
+        ON CONFLICT (tmdb_id) DO NOTHING
+        RETURNING {_COLUMNAS_PELICULA}
+    )
+    SELECT {_COLUMNAS_PELICULA} FROM nueva
+    UNION ALL
+    {_SQL_PELICULA_EXISTENTE} AND NOT EXISTS (SELECT 1 FROM nueva)
+"""
+
+_SQL_ESTADISTICAS = f"""
+    INSERT INTO {EstadisticasUsuario._meta.db_table} (
+        usuario_id, vistos, favoritos, suma_calificaciones, calificaciones, ultima_actividad
+    )
+    SELECT %s, {{vistos}}, {{favoritos}}, 0, 0, {{actividad}} FROM nuevo
+    ON CONFLICT (usuario_id) DO UPDATE SET
+        {{contador}} = {EstadisticasUsuario._meta.db_table}.{{contador}} + 1,
+        ultima_actividad = GREATEST(
+            {EstadisticasUsuario._meta.db_table}.ultima_actividad, EXCLUDED.ultima_actividad
+        )
+"""
+
+_SQL_EXISTENTE = {
+    Favorito: f"""
+        SELECT id, NULL::integer AS calificacion, false AS creado FROM {Favorito._meta.db_table}
+        WHERE usuario_id = %s AND pelicula_id = %s
+    """,
+    Visto: f"""
+        SELECT id, calificacion, false AS creado FROM {Visto._meta.db_table}
+        WHERE usuario_id = %s AND pelicula_id = %s
+    """,
+}
+
+_SQL_COLECCION = {
+    Favorito: f"""
+        WITH nuevo AS (
+            INSERT INTO {Favorito._meta.db_table} (usuario_id, pelicula_id)
+            VALUES (%s, %s)
+            ON CONFLICT (usuario_id, pelicula_id) DO NOTHING
+            RETURNING id, NULL::integer AS calificacion, true AS creado
+        ), estadisticas AS ({_SQL_ESTADISTICAS.format(vistos=0, favoritos=1, contador="favoritos", actividad="NULL::timestamptz")})
+        SELECT id, calificacion, creado FROM nuevo
+        UNION ALL
+        {_SQL_EXISTENTE[Favorito]} AND NOT EXISTS (SELECT 1 FROM nuevo)
+    """,
+    Visto: f"""
+        WITH nuevo AS (
+            INSERT INTO {Visto._meta.db_table} (
+                usuario_id, pelicula_id, fecha_visto, nota_personal, porcentaje_visto
+            )
+            VALUES (%s, %s, now(), '', 100)
+            ON CONFLICT (usuario_id, pelicula_id) DO NOTHING
+            RETURNING id, calificacion, true AS creado
+        ), estadisticas AS ({_SQL_ESTADISTICAS.format(vistos=1, favoritos=0, contador="vistos", actividad="now()")})
+        SELECT id, calificacion, creado FROM nuevo
+        UNION ALL
+        {_SQL_EXISTENTE[Visto]} AND NOT EXISTS (SELECT 1 FROM nuevo)
+    """,
+}
+
+
+def _ejecutar(sql, params, releer, params_releer):
+    # Carrera con otra transacción que insertó la fila: la sentencia no devuelve
+    # nada y la relectura (nueva instantánea) sí la ve
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        fila = cursor.fetchone()
+        if fila is None:
+            cursor.execute(releer, params_releer)
+            fila = cursor.fetchone()
+    return fila
+
+
+def upsert_pelicula(tmdb_id, item):
+    """Pelicula con ese tmdb_id, creándola desde el payload si no existe (una sentencia)."""
+    nueva = _pelicula_desde_payload(tmdb_id, item)
+    pk, titulo, descripcion, poster, fecha, vote_average, genre_ids = _ejecutar(
+        _SQL_PELICULA,
+        [tmdb_id, nueva.titulo, nueva.descripcion, nueva.poster, nueva.fecha_lanzamiento, tmdb_id],
+        _SQL_PELICULA_EXISTENTE,
+        [tmdb_id],
+    )
+    if isinstance(genre_ids, str):
+        genre_ids = json.loads(genre_ids)
+    return Pelicula(
+        id=pk, tmdb_id=tmdb_id, titulo=titulo, descripcion=descripcion, poster=poster,
+        fecha_lanzamiento=fecha, vote_average=vote_average, genre_ids=genre_ids,
+    )
+
+
+def agregar_uno(modelo, usuario, item):
+    """
+    Agrega una película (payload de TMDb) a Favorito o Visto del usuario.
+    Devuelve (pelicula, id, calificacion, creado); None si el payload no trae tmdb_id.
+    """
+    tmdb_id = _tmdb_id(item)
+    if tmdb_id is None:
+        return None
+    pelicula = upsert_pelicula(tmdb_id, item)
+    pk, calificacion, creado = _ejecutar(
+        _SQL_COLECCION[modelo],
+        [usuario.pk, pelicula.pk, usuario.pk, usuario.pk, pelicula.pk],
+        _SQL_EXISTENTE[modelo],
+        [usuario.pk, pelicula.pk],
+    )
+    return pelicula, pk, calificacion, creado
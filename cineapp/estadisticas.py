@@ -0,0 +1,135 @@
+# cineapp/estadisticas.py
+import threading
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import EstadisticasUsuario, Favorito, Usuario, Visto
+
+# ============================
+# Estadísticas de perfil
+# ============================
+# Cada alta/baja/cambio de Favorito o Visto suma su delta a la fila del usuario
+# con F() dentro de la misma transacción que la fila (Favorito.save/Visto.save
+# son atómicos), así el perfil se lee con una sola consulta por PK.
+# `ultima_actividad` es el fecha_visto más reciente del usuario, lo mismo que
+# deriva `reconstruir`, que recalcula todo desde las tablas si hay deriva
+# (cargas masivas, ediciones directas en la base, etc.).
+
+_estado = threading.local()
+
+
+@contextmanager
+def suspender_estadisticas():
+    """
+    Desactiva los ajustes por fila de las señales en este hilo. Para operaciones
+    masivas, que luego recalculan una sola vez con `reconstruir`.
+    """
+    _estado.suspendidas = getattr(_estado, "suspendidas", 0) + 1
+    try:
+        yield
+    finally:
+        _estado.suspendidas -= 1
+
+
+def suspendidas():
+    return getattr(_estado, "suspendidas", 0) > 0
+
+
+def _ultimo_visto():
+    return Subquery(
+        Visto.objects.filter(usuario=OuterRef("usuario")).order_by("-fecha_visto").values("fecha_visto")[:1]
+    )
+
+
+def ajustar(usuario_id, crear=False, visto_en=None, recalcular_actividad=False, **deltas):
+    """
+    Suma `deltas` (vistos=1, suma_calificaciones=-4, ...) a las estadísticas del usuario.
+    Con `crear=True` crea la fila si todavía no existe (solo en altas: en bajas
+    por cascada el usuario puede estar borrándose). `visto_en` es el fecha_visto
+    de un Visto nuevo; `recalcular_actividad` relee el último tras borrar uno.
+    """
+    deltas = {campo: delta for campo, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    cambios = {campo: F(campo) + delta for campo, delta in deltas.items()}
+    if visto_en is not None:
+        # GREATEST de Postgres ignora el NULL de una fila sin actividad previa
+        cambios["ultima_actividad"] = Greatest(F("ultima_actividad"), Value(visto_en))
+    elif recalcular_actividad:
+        cambios["ultima_actividad"] = _ultimo_visto()
+    if EstadisticasUsuario.objects.filter(usuario_id=usuario_id).update(**cambios):
+        return
+    if not crear:
+        return
+    try:
+        with transaction.atomic():
+            EstadisticasUsuario.objects.create(usuario_id=usuario_id, ultima_actividad=visto_en, **deltas)
+    except IntegrityError:
+        # Otra petición creó la fila a la vez
+        EstadisticasUsuario.objects.filter(usuario_id=usuario_id).update(**cambios)
+
+
+def deltas_visto(calificacion, signo=1):
+    return {
+        "vistos": signo,
+        "suma_calificaciones": signo * (calificacion or 0),
+        "calificaciones": signo * (calificacion is not None),
+    }
+
+
+def _por_usuario(modelo, agregado):
+    return Coalesce(
+        Subquery(
+            modelo.objects.filter(usuario=OuterRef("pk"))
+            .order_by()
+            .values("usuario")
+            .annotate(valor=agregado)
+            .values("valor")
+        ),
+        Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def reconstruir(usuario_ids=None, lote=1000):
+    """Recalcula las estadísticas desde Favorito/Visto. Devuelve la cantidad de usuarios procesados."""
+    usuarios = Usuario.objects.all()
+    if usuario_ids is not None:
+        usuarios = usuarios.filter(pk__in=usuario_ids)
+    filas = usuarios.order_by().annotate(
+        n_vistos=_por_usuario(Visto, Count("id")),
+        n_favoritos=_por_usuario(Favorito, Count("id")),
+        suma=_por_usuario(Visto, Sum("calificacion")),
+        n_calificaciones=_por_usuario(Visto, Count("id", filter=Q(calificacion__isnull=False))),
+        ultima=Subquery(
+            Visto.objects.filter(usuario=OuterRef("pk")).order_by().values("usuario")
+            .annotate(valor=Max("fecha_visto")).values("valor")
+        ),
+    ).values_list("pk", "n_vistos", "n_favoritos", "suma", "n_calificaciones", "ultima")
+
+    total = 0
+    pendientes = []
+    for pk, n_vistos, n_favoritos, suma, n_calificaciones, ultima in filas.iterator(chunk_size=lote):
+        pendientes.append(EstadisticasUsuario(
+            usuario_id=pk, vistos=n_vistos, favoritos=n_favoritos,
+            suma_calificaciones=suma, calificaciones=n_calificaciones, ultima_actividad=ultima,
+        ))
+        if len(pendientes) >= lote:
+            total += _guardar(pendientes)
+            pendientes = []
+    if pendientes:
+        total += _guardar(pendientes)
+    return total
+
+
+def _guardar(filas):
+    EstadisticasUsuario.objects.bulk_create(
+        filas,
+        update_conflicts=True,
+        unique_fields=["usuario"],
+        update_fields=["vistos", "favoritos", "suma_calificaciones", "calificaciones", "ultima_actividad"],
+    )
+    return len(filas)
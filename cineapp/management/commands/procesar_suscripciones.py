@@ -0,0 +1,18 @@
+# cineapp/management/commands/procesar_suscripciones.py
+from django.core.management.base import BaseCommand
+
+from cineapp import suscripciones
+
+
+class Command(BaseCommand):
+    help = (
+        "Renueva las suscripciones vencidas con renovación automática y expira el resto. "
+        "Se puede ejecutar en varios procesos a la vez"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=1000, help="Suscripciones por transacción")
+
+    def handle(self, *args, **options):
+        renovadas, expiradas = suscripciones.procesar_vencidas(lote=options["lote"])
+        self.stdout.write(self.style.SUCCESS(f"Suscripciones renovadas: {renovadas}, expiradas: {expiradas}"))
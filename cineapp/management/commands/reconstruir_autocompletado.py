@@ -0,0 +1,12 @@
+# cineapp/management/commands/reconstruir_autocompletado.py
+from django.core.management.base import BaseCommand
+
+from cineapp import autocompletado
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de prefijos de autocompletado desde Pelicula"
+
+    def handle(self, *args, **options):
+        total = autocompletado.reconstruir()
+        self.stdout.write(self.style.SUCCESS(f"Índice de autocompletado reconstruido: {total} prefijos"))
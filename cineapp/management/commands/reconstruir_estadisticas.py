@@ -0,0 +1,16 @@
+# cineapp/management/commands/reconstruir_estadisticas.py
+from django.core.management.base import BaseCommand
+
+from cineapp import estadisticas
+
+
+class Command(BaseCommand):
+    help = "Recalcula EstadisticasUsuario desde Favorito y Visto (corrige deriva de los contadores)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuario", type=int, action="append", help="Solo estos usuarios (repetible)")
+        parser.add_argument("--lote", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = estadisticas.reconstruir(options["usuario"], lote=options["lote"])
+        self.stdout.write(self.style.SUCCESS(f"Estadísticas recalculadas para {total} usuarios"))
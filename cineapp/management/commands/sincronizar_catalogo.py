@@ -0,0 +1,162 @@
+# cineapp/management/commands/sincronizar_catalogo.py
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from cineapp import autocompletado, tmdb_client
+from cineapp.models import Pelicula
+from cineapp.views import normalize_movie
+
+logger = logging.getLogger(__name__)
+
+LISTAS = {
+    "populares": "/movie/popular",
+    "estrenos": "/movie/now_playing",
+    "mejor_valoradas": "/movie/top_rated",
+}
+
+# Campos que se comparan para decidir si una fila cambió
+CAMPOS = [
+    "titulo", "descripcion", "poster", "fecha_lanzamiento",
+    "vote_average", "genre_ids", "popularidad", "en_cartelera",
+]
+
+
+def _fila(movie, en_cartelera):
+    normal = normalize_movie(movie)
+    try:
+        fecha = parse_date(normal["release_date"] or "")
+    except ValueError:
+        fecha = None
+    return {
+        "titulo": (normal["title"] or "")[:200],
+        "descripcion": normal["overview"] or "",
+        "poster": normal["poster_path"],
+        "fecha_lanzamiento": fecha,
+        "vote_average": float(normal["vote_average"] or 0),
+        "genre_ids": normal["genre_ids"] or [],
+        "popularidad": float(movie.get("popularity") or 0),
+        "en_cartelera": en_cartelera,
+    }
+
+
+class Command(BaseCommand):
+    help = "Sincroniza en Pelicula las listas populares, estrenos y mejor valoradas de TMDb"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--paginas", type=int, default=500, help="Máximo de páginas por lista (TMDb permite 500)")
+        parser.add_argument("--lote", type=int, default=1000, help="Filas por upsert")
+        parser.add_argument("--hilos", type=int, default=8, help="Peticiones concurrentes a TMDb")
+        parser.add_argument(
+            "--sin-autocompletado", action="store_true",
+            help="No reconstruir el índice de autocompletado al terminar",
+        )
+
+    def handle(self, *args, **options):
+        self.paginas = options["paginas"]
+        self.hilos = options["hilos"]
+
+        peliculas = {}
+        en_cartelera = set()
+        cartelera_completa = False
+        for nombre, path in LISTAS.items():
+            resultados, completa = self._descargar_lista(path)
+            self.stdout.write(f"{nombre}: {len(resultados)} títulos")
+            if nombre == "estrenos":
+                cartelera_completa = completa
+            for movie in resultados:
+                if movie.get("id"):
+                    peliculas[movie["id"]] = movie
+                    if nombre == "estrenos":
+                        en_cartelera.add(movie["id"])
+
+        if not peliculas:
+            raise CommandError("TMDb no devolvió resultados")
+
+        # Con la lista de estrenos incompleta no se sabe qué salió de cartelera:
+        # las películas que no aparecen conservan su valor (None = no tocar)
+        filas = {
+            tmdb_id: _fila(movie, tmdb_id in en_cartelera or (False if cartelera_completa else None))
+            for tmdb_id, movie in peliculas.items()
+        }
+        ids = list(filas)
+        escritas = 0
+        for i in range(0, len(ids), options["lote"]):
+            lote = {tmdb_id: filas[tmdb_id] for tmdb_id in ids[i:i + options["lote"]]}
+            escritas += self._upsert(lote)
+
+        retiradas = 0
+        if cartelera_completa:
+            retiradas = (
+                Pelicula.objects.filter(en_cartelera=True)
+                .exclude(tmdb_id__in=en_cartelera)
+                .update(en_cartelera=False, fecha_sincronizacion=timezone.now())
+            )
+        else:
+            logger.warning("Lista de estrenos incompleta: no se retira nada de cartelera")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(filas)} títulos procesados, {escritas} insertados/actualizados, "
+            f"{retiradas} retirados de cartelera"
+        ))
+
+        if (escritas or retiradas) and not options["sin_autocompletado"]:
+            prefijos = autocompletado.reconstruir()
+            self.stdout.write(f"Índice de autocompletado reconstruido: {prefijos} prefijos")
+
+    def _pagina(self, path, page):
+        """JSON de la página, o None si no se pudo descargar."""
+        try:
+            res = tmdb_client.get(path, {"page": page}, endpoint="catalogo")
+        except tmdb_client.TMDbError as e:
+            self.stderr.write(f"{path} página {page}: {e}")
+            return None
+        if res.status_code != 200:
+            self.stderr.write(f"{path} página {page}: HTTP {res.status_code}")
+            return None
+        return res.json()
+
+    def _descargar_lista(self, path):
+        """Devuelve (resultados, completa): completa es False si falló alguna página."""
+        primera = self._pagina(path, 1)
+        if primera is None:
+            return [], False
+        total = min(primera.get("total_pages", 1), self.paginas)
+        resultados = list(primera.get("results", []))
+        completa = True
+        with ThreadPoolExecutor(max_workers=self.hilos) as pool:
+            for data in pool.map(lambda p: self._pagina(path, p), range(2, total + 1)):
+                if data is None:
+                    completa = False
+                    continue
+                resultados.extend(data.get("results", []))
+        return resultados, completa
+
+    def _upsert(self, lote):
+        """Inserta las nuevas y actualiza solo las filas cuyo contenido cambió."""
+        existentes = {
+            p["tmdb_id"]: p
+            for p in Pelicula.objects.filter(tmdb_id__in=list(lote)).values("tmdb_id", *CAMPOS)
+        }
+        for tmdb_id, fila in lote.items():
+            if fila["en_cartelera"] is None:
+                fila["en_cartelera"] = existentes[tmdb_id]["en_cartelera"] if tmdb_id in existentes else False
+        ahora = timezone.now()
+        pendientes = [
+            Pelicula(tmdb_id=tmdb_id, fecha_sincronizacion=ahora, **fila)
+            for tmdb_id, fila in lote.items()
+            if tmdb_id not in existentes or any(existentes[tmdb_id][c] != fila[c] for c in CAMPOS)
+        ]
+        if pendientes:
+            with transaction.atomic():
+                Pelicula.objects.bulk_create(
+                    pendientes,
+                    update_conflicts=True,
+                    unique_fields=["tmdb_id"],
+                    update_fields=CAMPOS + ["fecha_sincronizacion"],
+                )
+        return len(pendientes)
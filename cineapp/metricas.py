@@ -0,0 +1,60 @@
+# cineapp/metricas.py
+import logging
+import threading
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Contadores compartidos que se registran con incrementar_compartido
+COMPARTIDAS = ("coalescencia.lider", "coalescencia.coalescidas", "coalescencia.espera_agotada")
+
+_lock = threading.Lock()
+_contadores = {}
+_latencias = {}
+
+
+def incrementar(nombre, cantidad=1):
+    """Suma `cantidad` al contador `nombre` del proceso actual."""
+    with _lock:
+        _contadores[nombre] = _contadores.get(nombre, 0) + cantidad
+
+
+def observar(nombre, milisegundos):
+    """Registra una latencia (en ms) para `nombre`: conteo, total y máximo."""
+    with _lock:
+        conteo, total, maximo = _latencias.get(nombre, (0, 0.0, 0.0))
+        _latencias[nombre] = (conteo + 1, total + milisegundos, max(maximo, milisegundos))
+
+
+def snapshot():
+    """Devuelve una copia de las métricas acumuladas por este worker."""
+    with _lock:
+        return {
+            "contadores": dict(_contadores),
+            "latencias": {
+                nombre: {
+                    "conteo": conteo,
+                    "promedio_ms": round(total / conteo, 2) if conteo else 0,
+                    "max_ms": round(maximo, 2),
+                }
+                for nombre, (conteo, total, maximo) in _latencias.items()
+            },
+        }
+
+
+def incrementar_compartido(nombre, cantidad=1):
+    """Contador compartido entre workers (Redis). Solo para caminos fríos: cuesta un round trip."""
+    incrementar(nombre, cantidad)
+    key = f"metricas:{nombre}"
+    try:
+        cache.add(key, 0, None)
+        cache.incr(key, cantidad)
+    except Exception:
+        logger.warning("No se pudo actualizar la métrica compartida %s", nombre)
+
+
+def leer_compartidos(nombres=COMPARTIDAS):
+    """Valor actual de los contadores compartidos (0 si nunca se incrementaron)."""
+    valores = cache.get_many([f"metricas:{n}" for n in nombres])
+    return {n: valores.get(f"metricas:{n}", 0) for n in nombres}
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cineapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pelicula',
+            name='en_cartelera',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='pelicula',
+            name='fecha_sincronizacion',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='pelicula',
+            name='genre_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='pelicula',
+            name='popularidad',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pelicula',
+            name='vote_average',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='pelicula',
+            index=models.Index(fields=['-popularidad'], name='pelicula_popularidad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pelicula',
+            index=models.Index(condition=models.Q(('en_cartelera', True)), fields=['-popularidad'], name='pelicula_cartelera_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cineapp', '0002_catalogo_local'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddField(
+            model_name='pelicula',
+            name='busqueda',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('titulo', config='spanish', weight='A'), '||', django.contrib.postgres.search.SearchVector('descripcion', config='spanish', weight='B'), django.contrib.postgres.search.SearchConfig('spanish')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='pelicula',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['busqueda'], name='pelicula_busqueda_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='pelicula',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['titulo'], name='pelicula_titulo_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
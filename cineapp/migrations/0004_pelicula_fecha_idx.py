@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cineapp', '0003_busqueda_local'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pelicula',
+            index=models.Index(fields=['-fecha_lanzamiento', '-id'], name='pelicula_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cineapp', '0004_pelicula_fecha_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='favorito',
+            index=models.Index(fields=['usuario', '-id'], name='favorito_usuario_reciente_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visto',
+            index=models.Index(fields=['usuario', '-fecha_visto', '-id'], name='visto_usuario_reciente_idx'),
+        ),
+    ]
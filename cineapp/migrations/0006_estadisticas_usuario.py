@@ -0,0 +1,56 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def poblar_estadisticas(apps, schema_editor):
+    # Carga inicial desde los datos existentes; luego las señales mantienen los contadores
+    Visto = apps.get_model('cineapp', 'Visto')
+    Favorito = apps.get_model('cineapp', 'Favorito')
+    EstadisticasUsuario = apps.get_model('cineapp', 'EstadisticasUsuario')
+
+    filas = {}
+    vistos = Visto.objects.order_by().values('usuario_id').annotate(
+        n=Count('id'),
+        suma=Sum('calificacion'),
+        calificadas=Count('id', filter=Q(calificacion__isnull=False)),
+        ultima=Max('fecha_visto'),
+    )
+    for v in vistos:
+        filas[v['usuario_id']] = EstadisticasUsuario(
+            usuario_id=v['usuario_id'], vistos=v['n'], suma_calificaciones=v['suma'] or 0,
+            calificaciones=v['calificadas'], ultima_actividad=v['ultima'],
+        )
+    for f in Favorito.objects.order_by().values('usuario_id').annotate(n=Count('id')):
+        fila = filas.setdefault(f['usuario_id'], EstadisticasUsuario(usuario_id=f['usuario_id']))
+        fila.favoritos = f['n']
+    EstadisticasUsuario.objects.bulk_create(filas.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cineapp', '0005_listados_recientes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticasUsuario',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estadisticas', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('vistos', models.IntegerField(default=0)),
+                ('favoritos', models.IntegerField(default=0)),
+                ('suma_calificaciones', models.BigIntegerField(default=0)),
+                ('calificaciones', models.IntegerField(default=0)),
+                ('ultima_actividad', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Estadísticas de usuario',
+                'verbose_name_plural': 'Estadísticas de usuarios',
+            },
+        ),
+        migrations.RunPython(poblar_estadisticas, migrations.RunPython.noop),
+    ]
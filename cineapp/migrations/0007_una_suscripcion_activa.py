@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:23
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def cancelar_activas_duplicadas(apps, schema_editor):
+    # Antes de la restricción: de cada usuario con varias activas se conserva la más reciente
+    Suscripcion = apps.get_model('cineapp', 'Suscripcion')
+    duplicados = (
+        Suscripcion.objects.filter(estado='activa').order_by()
+        .values('usuario_id').annotate(n=Count('id'), ultima=Max('id')).filter(n__gt=1)
+    )
+    for fila in duplicados:
+        Suscripcion.objects.filter(usuario_id=fila['usuario_id'], estado='activa').exclude(
+            id=fila['ultima']
+        ).update(estado='cancelada')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cineapp', '0006_estadisticas_usuario'),
+    ]
+
+    operations = [
+        migrations.RunPython(cancelar_activas_duplicadas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='suscripcion',
+            constraint=models.UniqueConstraint(condition=models.Q(('estado', 'activa')), fields=('usuario',), name='suscripcion_una_activa_por_usuario'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cineapp', '0007_una_suscripcion_activa'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='suscripcion',
+            index=models.Index(condition=models.Q(('estado', 'activa')), fields=['fecha_fin'], name='suscripcion_vencimiento_idx'),
+        ),
+    ]
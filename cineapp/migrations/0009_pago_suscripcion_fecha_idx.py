@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cineapp', '0008_suscripcion_vencimiento_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='historialpago',
+            index=models.Index(fields=['suscripcion', '-fecha_pago', '-id'], name='pago_suscripcion_fecha_idx'),
+        ),
+    ]
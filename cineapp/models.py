@@ -1,12 +1,26 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 
 
 # =========================
 # USUARIO PERSONALIZADO
 # =========================
-class UsuarioManager(BaseUserManager):
+class UsuarioQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # update() no dispara post_save: sin esto un usuario desactivado en bloque
+        # seguiría autenticándose desde la cache hasta que caduque
+        from .authentication import invalidar
+
+        ids = list(self.values_list("pk", flat=True))
+        filas = super().update(**kwargs)
+        invalidar(*ids)
+        return filas
+
+
+class UsuarioManager(BaseUserManager.from_queryset(UsuarioQuerySet)):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError("El usuario debe tener un correo electrónico")
@@ -88,12 +102,21 @@ class Favorito(models.Model):
 
     class Meta:
         unique_together = ("usuario", "pelicula")
+        indexes = [
+            models.Index(fields=["usuario", "-id"], name="favorito_usuario_reciente_idx"),
+        ]
         verbose_name = "Favorito"
         verbose_name_plural = "Favoritos"
 
     def __str__(self):
         return f"Favorito {self.pelicula_id} de {self.usuario}"
 
+    def save(self, *args, **kwargs):
+        # La fila y el ajuste de EstadisticasUsuario (post_save) confirman juntos.
+        # delete() ya envía post_delete dentro de su propia transacción.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Visto(models.Model):
     usuario = models.ForeignKey(
@@ -115,6 +138,9 @@ class Visto(models.Model):
 
     class Meta:
         unique_together = ("usuario", "pelicula")
+        indexes = [
+            models.Index(fields=["usuario", "-fecha_visto", "-id"], name="visto_usuario_reciente_idx"),
+        ]
         verbose_name = "Visto"
         verbose_name_plural = "Vistos"
 
@@ -123,6 +149,42 @@ class Visto(models.Model):
         titulo = self.pelicula.titulo if self.pelicula_id and hasattr(self.pelicula, "titulo") else getattr(self, "titulo", "")
         return f"{titulo} visto por {self.usuario}"
 
+    def save(self, *args, **kwargs):
+        # Igual que Favorito.save: fila y estadísticas en la misma transacción
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Se recuerda la calificación cargada para ajustar EstadisticasUsuario al guardar
+        instancia = super().from_db(db, field_names, values)
+        cargados = dict(zip(field_names, values))
+        if "calificacion" in cargados:
+            instancia._calificacion_original = cargados["calificacion"]
+        return instancia
+
+
+class EstadisticasUsuario(models.Model):
+    """Contadores del perfil, mantenidos por las señales de Favorito/Visto (ver cineapp/estadisticas.py)."""
+    usuario = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        primary_key=True,
+        related_name="estadisticas",
+        on_delete=models.CASCADE
+    )
+    vistos = models.IntegerField(default=0)
+    favoritos = models.IntegerField(default=0)
+    suma_calificaciones = models.BigIntegerField(default=0)
+    calificaciones = models.IntegerField(default=0)  # vistos con calificación
+    ultima_actividad = models.DateTimeField(null=True, blank=True)  # último fecha_visto
+
+    class Meta:
+        verbose_name = "Estadísticas de usuario"
+        verbose_name_plural = "Estadísticas de usuarios"
+
+    def __str__(self):
+        return f"Estadísticas de {self.usuario_id}"
+
 # =========================
 # PELICULA
 # =========================
@@ -132,6 +194,34 @@ class Pelicula(models.Model):
     fecha_lanzamiento = models.DateField(null=True, blank=True)
     poster = models.URLField(null=True, blank=True)
     tmdb_id = models.IntegerField(unique=True, null=True, blank=True)  # 🔑 Para no duplicar
+    vote_average = models.FloatField(default=0)
+    genre_ids = models.JSONField(default=list, blank=True)
+    # Espejo local del catálogo de TMDb (ver `manage.py sincronizar_catalogo`)
+    popularidad = models.FloatField(default=0)
+    en_cartelera = models.BooleanField(default=False)
+    fecha_sincronizacion = models.DateTimeField(null=True, blank=True)
+    # Vector de búsqueda (español) mantenido por Postgres, ver cineapp/busqueda.py
+    busqueda = models.GeneratedField(
+        expression=(
+            SearchVector("titulo", weight="A", config="spanish")
+            + SearchVector("descripcion", weight="B", config="spanish")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["busqueda"], name="pelicula_busqueda_gin"),
+            GinIndex(fields=["titulo"], name="pelicula_titulo_trgm", opclasses=["gin_trgm_ops"]),
+            models.Index(fields=["-popularidad"], name="pelicula_popularidad_idx"),
+            models.Index(fields=["-fecha_lanzamiento", "-id"], name="pelicula_fecha_idx"),
+            models.Index(
+                fields=["-popularidad"],
+                name="pelicula_cartelera_idx",
+                condition=models.Q(en_cartelera=True),
+            ),
+        ]
 
     def __str__(self):
         return self.titulo
@@ -182,6 +272,24 @@ class Suscripcion(models.Model):
     metodo_pago = models.CharField(max_length=50, blank=True)
     es_renovacion_automatica = models.BooleanField(default=True)
 
+    class Meta:
+        constraints = [
+            # Como mucho una suscripción activa por usuario (ver cineapp/suscripciones.py)
+            models.UniqueConstraint(
+                fields=["usuario"],
+                condition=models.Q(estado="activa"),
+                name="suscripcion_una_activa_por_usuario",
+            ),
+        ]
+        indexes = [
+            # Suscripciones activas por vencer (manage.py procesar_suscripciones)
+            models.Index(
+                fields=["fecha_fin"],
+                name="suscripcion_vencimiento_idx",
+                condition=models.Q(estado="activa"),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.usuario.email} - {self.plan.nombre}"
 
@@ -203,5 +311,10 @@ class HistorialPago(models.Model):
     transaccion_id = models.CharField(max_length=100, unique=True)
     estado = models.CharField(max_length=20, default='completado')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["suscripcion", "-fecha_pago", "-id"], name="pago_suscripcion_fecha_idx"),
+        ]
+
     def __str__(self):
         return f"Pago {self.transaccion_id} - ${self.monto}"
@@ -0,0 +1,106 @@
+# cineapp/paginacion.py
+import base64
+import binascii
+import datetime
+import decimal
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+# ============================
+# Paginación por cursor (keyset)
+# ============================
+# En lugar de OFFSET se filtra "después del último elemento visto" sobre un
+# orden indexado, así el costo de cada página no depende de su posición. El
+# cursor es opaco para el cliente: base64 de los valores de orden del último
+# elemento. Los campos de `orden` no deben ser nulos y el último debe ser único.
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def _serializar(valor):
+    if isinstance(valor, (datetime.date, datetime.datetime)):
+        return valor.isoformat()
+    if isinstance(valor, decimal.Decimal):
+        return str(valor)
+    raise TypeError(f"Valor de cursor no serializable: {valor!r}")
+
+
+def codificar_cursor(valores):
+    crudo = json.dumps(valores, default=_serializar, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor, campos):
+    """
+    Valores del cursor convertidos con `to_python` de cada campo de `campos`
+    (los del orden). Un cursor manipulado da CursorInvalido (400), no un
+    error de la base de datos al filtrar.
+    """
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valores = json.loads(crudo)
+    except (binascii.Error, ValueError):
+        raise CursorInvalido("Cursor inválido")
+    if not isinstance(valores, list) or len(valores) != len(campos):
+        raise CursorInvalido("Cursor inválido")
+    try:
+        valores = [campo.to_python(valor) for campo, valor in zip(campos, valores)]
+    except (ValueError, TypeError, ValidationError):
+        raise CursorInvalido("Cursor inválido")
+    if any(valor is None for valor in valores):
+        raise CursorInvalido("Cursor inválido")
+    return valores
+
+
+def tamano_pagina(request):
+    """`?page_size=` acotado a PAGINACION_MAXIMO; el valor por defecto si falta o es inválido."""
+    try:
+        tamano = int(request.GET.get("page_size", settings.PAGINACION_TAMANO))
+    except ValueError:
+        tamano = settings.PAGINACION_TAMANO
+    return max(1, min(tamano, settings.PAGINACION_MAXIMO))
+
+
+def _despues_de(orden, valores):
+    filtro = Q()
+    iguales = {}
+    for campo, valor in zip(orden, valores):
+        nombre = campo.lstrip("-")
+        lookup = "lt" if campo.startswith("-") else "gt"
+        filtro |= Q(**iguales, **{f"{nombre}__{lookup}": valor})
+        iguales[nombre] = valor
+    if len(orden) > 1:
+        # Redundante, pero Postgres no usa el OR de arriba como límite del
+        # índice compuesto: sin esta condición recorre el índice desde el
+        # principio y filtra, y las páginas profundas se vuelven lentas
+        nombre = orden[0].lstrip("-")
+        lookup = "lte" if orden[0].startswith("-") else "gte"
+        filtro &= Q(**{f"{nombre}__{lookup}": valores[0]})
+    return filtro
+
+
+def _valor(obj, campo):
+    nombre = campo.lstrip("-")
+    return obj[nombre] if isinstance(obj, dict) else getattr(obj, nombre)
+
+
+def paginar_keyset(queryset, orden, cursor, limite):
+    """
+    Devuelve (elementos, siguiente_cursor) de `queryset` ordenado por `orden`
+    (p.ej. ["-fecha_visto", "-id"]). `siguiente_cursor` es None en la última página.
+    Lanza CursorInvalido si el cursor no corresponde a este orden.
+    """
+    if cursor:
+        campos = [queryset.model._meta.get_field(campo.lstrip("-")) for campo in orden]
+        queryset = queryset.filter(_despues_de(orden, decodificar_cursor(cursor, campos)))
+    elementos = list(queryset.order_by(*orden)[:limite + 1])
+    siguiente = None
+    if len(elementos) > limite:
+        elementos = elementos[:limite]
+        siguiente = codificar_cursor([_valor(elementos[-1], campo) for campo in orden])
+    return elementos, siguiente
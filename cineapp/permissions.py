@@ -0,0 +1,56 @@
+# cineapp/permissions.py
+import time
+
+from rest_framework.permissions import BasePermission
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import PlanSuscripcion
+from .suscripciones import ultimo_cambio_plan
+
+# ============================
+# Permisos por plan (solo con el token)
+# ============================
+# El access token trae `plan` y `plan_exp` (cineapp/serializers_jwt.py), así que
+# no hace falta leer Suscripcion/PlanSuscripcion por petición. Un token emitido
+# antes del último cambio de suscripción del usuario no cuenta como prueba de
+# plan: el cliente debe refrescarlo (el refresh recalcula los claims).
+
+# Orden de los planes según TIPO_CHOICES: basico < premium < vip
+NIVELES = {tipo: nivel for nivel, (tipo, _) in enumerate(PlanSuscripcion.TIPO_CHOICES)}
+
+
+def plan_del_token(request):
+    """Tipo de plan vigente según el access token de la petición, o None."""
+    token = request.auth
+    if token is None:
+        return None
+    plan = token.get("plan")
+    plan_exp = token.get("plan_exp")
+    if plan not in NIVELES or not plan_exp or plan_exp <= time.time():
+        return None
+    cambio = ultimo_cambio_plan(token.get(api_settings.USER_ID_CLAIM))
+    if cambio is not None and token.get("iat", 0) < cambio:
+        return None
+    return plan
+
+
+class PlanMinimo(BasePermission):
+    """Exige un plan igual o superior a `plan_minimo`. Usar una de las subclases."""
+    plan_minimo = None
+    message = "Tu plan no incluye esta función. Si cambiaste de plan, refresca el token."
+
+    def has_permission(self, request, view):
+        plan = plan_del_token(request)
+        return plan is not None and NIVELES[plan] >= NIVELES[self.plan_minimo]
+
+
+class PlanBasico(PlanMinimo):
+    plan_minimo = "basico"
+
+
+class PlanPremium(PlanMinimo):
+    plan_minimo = "premium"
+
+
+class PlanVIP(PlanMinimo):
+    plan_minimo = "vip"
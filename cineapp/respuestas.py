@@ -0,0 +1,146 @@
+# cineapp/respuestas.py
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework.renderers import JSONRenderer
+
+from .cache_utils import acache
+
+# ============================
+# Respuestas JSON pre-renderizadas
+# ============================
+# En cache se guardan los bytes ya renderizados (y su versión gzip) junto con
+# sus ETags fuertes, así un hit no vuelve a pasar por el renderer de DRF. Cada
+# codificación tiene su propio ETag (la gzip con sufijo "-gz"): son bytes
+# distintos y un ETag fuerte no puede compartirse entre ellos. Las dos ETags se
+# guardan además en una clave pequeña aparte (`<key>:etag`) para contestar 304
+# a `If-None-Match` sin leer el payload.
+
+
+def renderizar(data):
+    cuerpo = JSONRenderer().render(data)
+    comprimido = None
+    if len(cuerpo) >= settings.RESPUESTA_GZIP_MINIMO:
+        comprimido = gzip.compress(cuerpo, compresslevel=6)
+    resumen = hashlib.blake2b(cuerpo, digest_size=16).hexdigest()
+    return {
+        "cuerpo": cuerpo,
+        "gzip": comprimido,
+        "etag": '"%s"' % resumen,
+        "etag_gzip": '"%s-gz"' % resumen if comprimido else None,
+    }
+
+
+def _acepta_gzip(request):
+    return "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+
+
+def _etags(entrada):
+    # Lo que se guarda en `<key>:etag`. Las entradas cacheadas antes de tener
+    # ETag por codificación no traen "etag_gzip": se sirven sin comprimir
+    return (entrada["etag"], entrada.get("etag_gzip"))
+
+
+def _etag_para(request, etags):
+    """ETag de la codificación que recibiría `request`, a partir de lo guardado en `<key>:etag`."""
+    if not isinstance(etags, (list, tuple)):
+        return None
+    identidad, comprimido = etags
+    return comprimido if comprimido and _acepta_gzip(request) else identidad
+
+
+def _coincide(request, etag):
+    cabecera = request.META.get("HTTP_IF_NONE_MATCH", "")
+    if not cabecera or not etag:
+        return False
+    etags = [e.strip() for e in cabecera.split(",")]
+    return "*" in etags or etag in etags
+
+
+def _no_modificado(etag):
+    respuesta = HttpResponseNotModified()
+    respuesta["ETag"] = etag
+    respuesta["Vary"] = "Accept-Encoding"
+    return respuesta
+
+
+def respuesta_json(request, entrada, status=200):
+    """HttpResponse con los bytes de `entrada`; 304 si el cliente ya tiene ese ETag."""
+    etag = _etag_para(request, _etags(entrada))
+    if _coincide(request, etag):
+        return _no_modificado(etag)
+
+    if etag == entrada.get("etag_gzip"):
+        respuesta = HttpResponse(entrada["gzip"], content_type="application/json", status=status)
+        respuesta["Content-Encoding"] = "gzip"
+    else:
+        respuesta = HttpResponse(entrada["cuerpo"], content_type="application/json", status=status)
+    respuesta["ETag"] = etag
+    respuesta["Vary"] = "Accept-Encoding"
+    return respuesta
+
+
+def respuesta_304_rapida(request, key):
+    """304 leyendo solo `<key>:etag`; None si hay que servir la respuesta completa."""
+    if "HTTP_IF_NONE_MATCH" not in request.META:
+        return None
+    etag = _etag_para(request, cache.get(f"{key}:etag"))
+    if _coincide(request, etag):
+        return _no_modificado(etag)
+    return None
+
+
+def renderizador(key, cargar, ttl_etag):
+    """
+    Envuelve `cargar` para que devuelva la entrada renderizada y publique su ETag.
+    `ttl_etag` debe ser el tiempo durante el que la entrada se considera vigente
+    (el TTL suave en las entradas stale-while-revalidate).
+    """
+    def cargar_renderizado():
+        data = cargar()
+        if data is None:
+            return None
+        entrada = renderizar(data)
+        cache.set(f"{key}:etag", _etags(entrada), ttl_etag)
+        return entrada
+    return cargar_renderizado
+
+
+def obtener_renderizado(key, cargar, ttl):
+    entrada = cache.get(key)
+    if entrada is None:
+        entrada = renderizador(key, cargar, ttl)()
+        if entrada is not None:
+            cache.set(key, entrada, ttl)
+    return entrada
+
+
+def invalidar(key):
+    cache.delete_many([key, f"{key}:etag"])
+
+
+# ============================
+# Variantes asíncronas (vistas ASGI)
+# ============================
+
+async def arespuesta_304_rapida(request, key):
+    if "HTTP_IF_NONE_MATCH" not in request.META:
+        return None
+    etag = _etag_para(request, await acache.aget(f"{key}:etag"))
+    if _coincide(request, etag):
+        return _no_modificado(etag)
+    return None
+
+
+def arenderizador(key, acargar, ttl_etag):
+    async def acargar_renderizado():
+        data = await acargar()
+        if data is None:
+            return None
+        entrada = renderizar(data)
+        await acache.aset(f"{key}:etag", _etags(entrada), ttl_etag)
+        return entrada
+    return acargar_renderizado
@@ -0,0 +1,52 @@
+# cineapp/revocacion.py
+import time
+
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+
+# ============================
+# Revocación de tokens (Redis)
+# ============================
+# Dos tipos de entrada, ambas con TTL para que desaparezcan solas:
+#   revocado_<jti>        un token concreto (logout, refresh ya rotado); vive
+#                         hasta el `exp` del token.
+#   revocado_desde_<id>   marca "todo lo emitido antes de T" de un usuario
+#                         (cerrar sesión en todos los dispositivos); vive lo
+#                         que el token más largo (REFRESH_TOKEN_LIFETIME).
+# Comprobar un token cuesta un único GET múltiple a Redis.
+
+
+def _clave_jti(jti):
+    return f"revocado_{jti}"
+
+
+def _clave_usuario(usuario_id):
+    return f"revocado_desde_{usuario_id}"
+
+
+def revocar(token):
+    """Revoca `token` (access o refresh de simplejwt) hasta que expire."""
+    restante = int(token["exp"] - time.time())
+    if restante > 0:
+        cache.set(_clave_jti(token[api_settings.JTI_CLAIM]), 1, restante)
+
+
+def revocar_todos(usuario_id):
+    """Revoca todos los tokens del usuario emitidos hasta este segundo inclusive."""
+    cache.set(
+        _clave_usuario(usuario_id),
+        int(time.time()),
+        int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()),
+    )
+
+
+def esta_revocado(token):
+    jti = _clave_jti(token.get(api_settings.JTI_CLAIM))
+    usuario = _clave_usuario(token.get(api_settings.USER_ID_CLAIM))
+    valores = cache.get_many([jti, usuario])
+    if jti in valores:
+        return True
+    # `iat` tiene resolución de segundos: lo emitido en el mismo segundo que la
+    # marca también se revoca (un login justo después debe reintentarse)
+    desde = valores.get(usuario)
+    return desde is not None and token.get("iat", 0) <= desde
@@ -1,5 +1,7 @@
 # cineapp/serializers.py
+from django.db.models import Exists, OuterRef, Prefetch
 from rest_framework import serializers
+from .suscripciones import suscripcion_actual
 from .models import (
     Usuario, Rol, Permiso, Favorito, Visto,
     PlanSuscripcion, Suscripcion, HistorialPago, Pelicula
@@ -17,12 +19,27 @@ class UsuarioSerializer(serializers.ModelSerializer):
         ]
 
     def get_suscripcion_activa(self, obj):
-        suscripcion = obj.suscripciones.filter(estado="activa").first()
+        # Listados: viene precargada con `con_suscripcion_activa` (sin consulta por usuario)
+        if hasattr(obj, "suscripciones_activas"):
+            suscripcion = obj.suscripciones_activas[0] if obj.suscripciones_activas else None
+        else:
+            suscripcion = suscripcion_actual(obj)
         if suscripcion and suscripcion.esta_activa:
             return SuscripcionSerializer(suscripcion).data
         return None
 
 
+def con_suscripcion_activa(queryset):
+    """Precarga en una consulta las suscripciones activas (con su plan) que usa UsuarioSerializer."""
+    return queryset.prefetch_related(
+        Prefetch(
+            "suscripciones",
+            queryset=Suscripcion.objects.filter(estado="activa").select_related("plan").order_by("id"),
+            to_attr="suscripciones_activas",
+        )
+    )
+
+
 # 🔑 Login
 class UsuarioLoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
@@ -125,25 +142,31 @@ class VistoSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+def anotar_pertenencia(queryset, usuario):
+    """Anota is_favorite/is_watched con subconsultas Exists: el listado sale en una sola consulta."""
+    return queryset.annotate(
+        is_favorite=Exists(Favorito.objects.filter(usuario=usuario, pelicula=OuterRef("pk"))),
+        is_watched=Exists(Visto.objects.filter(usuario=usuario, pelicula=OuterRef("pk"))),
+    )
+
+
 class PeliculaSerializer(serializers.ModelSerializer):
+    """
+    is_favorite / is_watched se leen de las anotaciones de `anotar_pertenencia`:
+    pasarle un queryset anotado (sin anotar valen False).
+    """
     is_favorite = serializers.SerializerMethodField()
     is_watched = serializers.SerializerMethodField()
 
     class Meta:
         model = Pelicula
-        fields = "__all__"
+        exclude = ["busqueda"]  # tsvector interno de la búsqueda local
 
     def get_is_favorite(self, obj):
-        request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            return Favorito.objects.filter(usuario=request.user, pelicula=obj).exists()
-        return False
+        return getattr(obj, "is_favorite", False)
 
     def get_is_watched(self, obj):
-        request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            return Visto.objects.filter(usuario=request.user, pelicula=obj).exists()
-        return False
+        return getattr(obj, "is_watched", False)
 
 
 class PlanSuscripcionSerializer(serializers.ModelSerializer):
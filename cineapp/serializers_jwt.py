@@ -1,9 +1,29 @@
 # cineapp/serializers_jwt.py
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import get_user_model
 
+from . import revocacion
+from .suscripciones import suscripcion_actual
+
 Usuario = get_user_model()
 
+
+def claims_plan(suscripcion):
+    """Claims de plan del token: tipo de plan y vencimiento (epoch) de la suscripción activa."""
+    if suscripcion and suscripcion.esta_activa:
+        return {"plan": suscripcion.plan.tipo, "plan_exp": int(suscripcion.fecha_fin.timestamp())}
+    return {"plan": None, "plan_exp": None}
+
+
+def tokens_con_plan(user, suscripcion):
+    """Par de tokens nuevo con los claims de `suscripcion` (tras activar o cancelar una suscripción)."""
+    refresh = EmailTokenObtainPairSerializer.token_class.for_user(user)
+    refresh.payload.update(claims_plan(suscripcion))
+    return {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+
 class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Serializer personalizado para que JWT use el email
@@ -11,6 +31,12 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     username_field = "email"
 
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token.payload.update(claims_plan(suscripcion_actual(user)))
+        return token
+
     def validate(self, attrs):
         """
         Extiende la validación para devolver también datos básicos del usuario
@@ -32,3 +58,34 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
         }
 
         return data
+
+
+class PlanTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh de simplejwt que además recalcula los claims de plan, así un
+    refresh después de cambiar de suscripción ya trae el plan vigente, y que
+    usa la revocación en Redis en lugar de la app token_blacklist.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if revocacion.esta_revocado(refresh):
+            raise InvalidToken({"detail": "Token revocado", "code": "token_revoked"})
+        usuario = Usuario(**{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]})
+        refresh.payload.update(claims_plan(suscripcion_actual(usuario)))
+
+        access = refresh.access_token
+        # simplejwt copia el iat del refresh; el access debe llevar su propia
+        # fecha de emisión para compararla con el último cambio de plan
+        access.set_iat()
+        data = {"access": str(access)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # El refresh usado queda revocado: cada refresh sirve una sola vez
+            revocacion.revocar(refresh)
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+
+        return data
@@ -0,0 +1,95 @@
+# cineapp/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import authentication, estadisticas, respuestas, suscripciones
+from .models import Favorito, PlanSuscripcion, Suscripcion, Usuario, Visto
+
+CACHE_PLANES = "planes_suscripcion_json"
+
+
+# =========================
+# Planes de suscripción
+# =========================
+@receiver(post_save, sender=PlanSuscripcion)
+@receiver(post_delete, sender=PlanSuscripcion)
+def invalidar_planes(sender, **kwargs):
+    transaction.on_commit(lambda: respuestas.invalidar(CACHE_PLANES))
+
+
+@receiver(post_save, sender=Suscripcion)
+@receiver(post_delete, sender=Suscripcion)
+def invalidar_suscripcion_actual(sender, instance, **kwargs):
+    # Cambios fuera de cineapp/suscripciones.py (admin, shell)
+    suscripciones.invalidar(instance.usuario_id)
+
+
+# =========================
+# Usuario cacheado por la autenticación JWT
+# =========================
+@receiver(post_save, sender=Usuario)
+@receiver(post_delete, sender=Usuario)
+def invalidar_usuario_autenticado(sender, instance, **kwargs):
+    authentication.invalidar(instance.pk)
+
+
+# =========================
+# Estadísticas de perfil
+# =========================
+@receiver(post_save, sender=Favorito)
+def favorito_creado(sender, instance, created, **kwargs):
+    if estadisticas.suspendidas():
+        return
+    if created:
+        estadisticas.ajustar(instance.usuario_id, crear=True, favoritos=1)
+
+
+@receiver(post_delete, sender=Favorito)
+def favorito_eliminado(sender, instance, **kwargs):
+    if estadisticas.suspendidas():
+        return
+    estadisticas.ajustar(instance.usuario_id, favoritos=-1)
+
+
+@receiver(pre_save, sender=Visto)
+def visto_por_guardar(sender, instance, **kwargs):
+    # Si la calificación estaba diferida al cargar, se lee la guardada antes de pisarla
+    if instance.pk and not instance._state.adding and not hasattr(instance, "_calificacion_original"):
+        instance._calificacion_original = (
+            Visto.objects.filter(pk=instance.pk).values_list("calificacion", flat=True).first()
+        )
+
+
+def _calificacion_guardada(instance):
+    # El valor que llegó a la columna (IntegerField), aunque se asignara un float
+    return Visto._meta.get_field("calificacion").get_prep_value(instance.calificacion)
+
+
+@receiver(post_save, sender=Visto)
+def visto_guardado(sender, instance, created, **kwargs):
+    anterior = getattr(instance, "_calificacion_original", None)
+    actual = _calificacion_guardada(instance)
+    instance._calificacion_original = actual
+    if estadisticas.suspendidas():
+        return
+    if created:
+        estadisticas.ajustar(
+            instance.usuario_id, crear=True, visto_en=instance.fecha_visto, **estadisticas.deltas_visto(actual)
+        )
+    elif actual != anterior:
+        estadisticas.ajustar(
+            instance.usuario_id,
+            suma_calificaciones=(actual or 0) - (anterior or 0),
+            calificaciones=(actual is not None) - (anterior is not None),
+        )
+
+
+@receiver(post_delete, sender=Visto)
+def visto_eliminado(sender, instance, **kwargs):
+    if estadisticas.suspendidas():
+        return
+    calificacion = getattr(instance, "_calificacion_original", _calificacion_guardada(instance))
+    estadisticas.ajustar(
+        instance.usuario_id, recalcular_actividad=True, **estadisticas.deltas_visto(calificacion, signo=-1)
+    )
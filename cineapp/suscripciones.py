@@ -0,0 +1,158 @@
+# cineapp/suscripciones.py
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .models import HistorialPago, Suscripcion, Usuario
+
+# ============================
+# Suscripciones
+# ============================
+# Un usuario tiene como mucho una suscripción `activa` (restricción única
+# parcial en models.Suscripcion). Activar y cancelar bloquean la fila del
+# usuario, así dos peticiones simultáneas del mismo usuario se serializan en
+# vez de dejar dos activas.
+
+DURACION_PERIODO = timedelta(days=30)
+
+# Marca en cache de "el usuario no tiene suscripción activa"
+SIN_SUSCRIPCION = "__sin_suscripcion__"
+
+
+def _clave(usuario_id):
+    return f"suscripcion_actual_{usuario_id}"
+
+
+def suscripcion_actual(usuario):
+    """Suscripción `activa` del usuario (con su plan) o None, cacheada por usuario."""
+    clave = _clave(usuario.pk)
+    cacheada = cache.get(clave)
+    if cacheada is not None:
+        return None if cacheada == SIN_SUSCRIPCION else cacheada
+
+    suscripcion = Suscripcion.objects.filter(usuario_id=usuario.pk, estado="activa").select_related("plan").first()
+    cache.set(clave, suscripcion or SIN_SUSCRIPCION, settings.SUSCRIPCION_CACHE_TTL)
+    return suscripcion
+
+
+def _clave_cambio_plan(usuario_id):
+    return f"plan_cambio_{usuario_id}"
+
+
+def invalidar(*usuario_ids):
+    """
+    Al confirmar la transacción en curso: borra la suscripción cacheada de esos
+    usuarios y marca el momento del cambio, para que los tokens emitidos antes
+    dejen de valer como prueba de plan (ver cineapp/permissions.py).
+    """
+    def aplicar():
+        cache.delete_many([_clave(pk) for pk in usuario_ids])
+        ahora = int(time.time())
+        cache.set_many(
+            {_clave_cambio_plan(pk): ahora for pk in usuario_ids},
+            int(jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds()),
+        )
+    transaction.on_commit(aplicar)
+
+
+def ultimo_cambio_plan(usuario_id):
+    """Timestamp del último cambio de suscripción del usuario (None si no hubo en la vida de un access token)."""
+    return cache.get(_clave_cambio_plan(usuario_id))
+
+
+def activar(usuario, plan, metodo_pago, es_renovacion_automatica=True):
+    """Cancela la suscripción activa (si hay), crea la nueva y registra el pago, todo en una transacción."""
+    with transaction.atomic():
+        Usuario.objects.select_for_update().only("id").get(pk=usuario.pk)
+        Suscripcion.objects.filter(usuario=usuario, estado="activa").update(estado="cancelada")
+        suscripcion = Suscripcion.objects.create(
+            usuario=usuario,
+            plan=plan,
+            fecha_fin=timezone.now() + DURACION_PERIODO,
+            metodo_pago=metodo_pago,
+            es_renovacion_automatica=es_renovacion_automatica,
+        )
+        HistorialPago.objects.create(
+            suscripcion=suscripcion,
+            monto=plan.precio_mensual,
+            metodo_pago=metodo_pago,
+            transaccion_id=f"TXN_{suscripcion.id}_{timezone.now().timestamp()}",
+        )
+        invalidar(usuario.pk)
+    return suscripcion
+
+
+def cancelar(usuario):
+    """Cancela la suscripción activa del usuario. Devuelve False si no tenía ninguna."""
+    with transaction.atomic():
+        Usuario.objects.select_for_update().only("id").get(pk=usuario.pk)
+        canceladas = Suscripcion.objects.filter(usuario=usuario, estado="activa").update(estado="cancelada")
+        invalidar(usuario.pk)
+    return canceladas > 0
+
+
+# ============================
+# Vencimientos y renovaciones
+# ============================
+# `procesar_vencidas` toma lotes de suscripciones activas vencidas con
+# SELECT ... FOR UPDATE SKIP LOCKED (índice parcial sobre fecha_fin), así varios
+# procesos pueden correr a la vez sin pisarse: cada uno salta las filas que otro
+# ya bloqueó. El id de transacción de la renovación depende de la suscripción y
+# del período, por lo que reprocesar un lote nunca cobra dos veces.
+
+
+def _procesar_lote(ahora, lote):
+    with transaction.atomic():
+        vencidas = list(
+            Suscripcion.objects.select_for_update(skip_locked=True, of=("self",))
+            .select_related("plan")
+            .filter(estado="activa", fecha_fin__lte=ahora)
+            .order_by("fecha_fin")
+            .only("id", "usuario", "fecha_fin", "metodo_pago", "es_renovacion_automatica",
+                  "plan", "plan__precio_mensual", "plan__es_activo")[:lote]
+        )
+        if not vencidas:
+            return 0, 0
+
+        renovar = [s for s in vencidas if s.es_renovacion_automatica and s.plan.es_activo]
+        expirar = [s.id for s in vencidas if not (s.es_renovacion_automatica and s.plan.es_activo)]
+        if renovar:
+            Suscripcion.objects.filter(id__in=[s.id for s in renovar]).update(
+                fecha_fin=Greatest(F("fecha_fin"), Value(ahora)) + DURACION_PERIODO,
+                fecha_renovacion=ahora,
+            )
+            HistorialPago.objects.bulk_create(
+                [
+                    HistorialPago(
+                        suscripcion_id=s.id,
+                        monto=s.plan.precio_mensual,
+                        metodo_pago=s.metodo_pago,
+                        transaccion_id=f"REN_{s.id}_{int(s.fecha_fin.timestamp())}",
+                    )
+                    for s in renovar
+                ],
+                ignore_conflicts=True,
+            )
+        if expirar:
+            Suscripcion.objects.filter(id__in=expirar).update(estado="expirada")
+        invalidar(*{s.usuario_id for s in vencidas})
+    return len(renovar), len(expirar)
+
+
+def procesar_vencidas(lote=1000):
+    """Renueva (renovación automática) o expira las suscripciones vencidas. Devuelve (renovadas, expiradas)."""
+    ahora = timezone.now()
+    renovadas = expiradas = 0
+    while True:
+        r, e = _procesar_lote(ahora, lote)
+        renovadas += r
+        expiradas += e
+        if r + e < lote:
+            return renovadas, expiradas
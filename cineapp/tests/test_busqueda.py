@@ -0,0 +1,44 @@
+# cineapp/tests/test_busqueda.py
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from cineapp import busqueda
+from cineapp.models import Pelicula
+
+
+def _hay_pg_trgm():
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+@override_settings(BUSQUEDA_LOCAL_CANDIDATOS=3)
+class BuscarLocalTests(TestCase):
+    """Con más coincidencias que candidatos: se rankean las más populares y el total es exacto."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Pelicula.objects.bulk_create(
+            Pelicula(tmdb_id=820000 + i, titulo=f"Tormenta {i}", popularidad=i) for i in range(5)
+        )
+        Pelicula.objects.create(tmdb_id=820099, titulo="Otra cosa", popularidad=100)
+
+    def setUp(self):
+        if not _hay_pg_trgm():
+            self.skipTest("hace falta PostgreSQL con pg_trgm")
+
+    def test_ventana_de_candidatos(self):
+        peliculas, total = busqueda.buscar_local("tormenta", 1, por_pagina=2)
+        self.assertEqual(total, 5)
+        self.assertEqual(busqueda.paginas(total, por_pagina=2), 2)
+        primera = [p.tmdb_id for p in peliculas]
+        peliculas, _ = busqueda.buscar_local("tormenta", 2, por_pagina=2)
+        # Solo las 3 más populares (popularidad 4, 3 y 2) entran en el ranking
+        self.assertEqual(sorted(primera + [p.tmdb_id for p in peliculas]), [820002, 820003, 820004])
+
+    def test_sin_ventana_llena(self):
+        peliculas, total = busqueda.buscar_local("otra cosa")
+        self.assertEqual(total, 1)
+        self.assertEqual([p.tmdb_id for p in peliculas], [820099])
@@ -0,0 +1,69 @@
+# cineapp/tests/test_colecciones.py
+import threading
+import unittest
+
+from django.db import connection, connections
+from django.test import TransactionTestCase
+
+from cineapp import colecciones
+from cineapp.models import EstadisticasUsuario, Favorito, Pelicula, Usuario, Visto
+
+HILOS = 16
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "SQL propio de PostgreSQL")
+class AgregarUnoConcurrenteTests(TransactionTestCase):
+    """Muchos POST simultáneos del mismo (usuario, película): una fila, sin IntegrityError."""
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(email="concurrencia@cinehub.test", password="x")
+
+    def _en_paralelo(self, modelo, item):
+        barrera = threading.Barrier(HILOS)
+        resultados, errores = [], []
+
+        def trabajar():
+            try:
+                barrera.wait()
+                resultados.append(colecciones.agregar_uno(modelo, self.usuario, item))
+            except Exception as e:
+                errores.append(e)
+            finally:
+                connections.close_all()
+
+        hilos = [threading.Thread(target=trabajar) for _ in range(HILOS)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        return resultados, errores
+
+    def _comprobar(self, modelo, contador):
+        item = {"id": 550, "title": "Fight Club", "release_date": "1999-10-15"}
+        resultados, errores = self._en_paralelo(modelo, item)
+
+        self.assertEqual(errores, [])
+        self.assertEqual(len(resultados), HILOS)
+        self.assertEqual(Pelicula.objects.filter(tmdb_id=550).count(), 1)
+        self.assertEqual(modelo.objects.filter(usuario=self.usuario).count(), 1)
+        fila = modelo.objects.get(usuario=self.usuario)
+        self.assertEqual({pk for _, pk, _, _ in resultados}, {fila.pk})
+        self.assertEqual(sum(creado for _, _, _, creado in resultados), 1)
+        estadisticas = EstadisticasUsuario.objects.get(usuario=self.usuario)
+        self.assertEqual(getattr(estadisticas, contador), 1)
+
+    def test_favorito(self):
+        self._comprobar(Favorito, "favoritos")
+
+    def test_visto(self):
+        self._comprobar(Visto, "vistos")
+
+    def test_pelicula_existente_no_se_reescribe(self):
+        pelicula = Pelicula.objects.create(tmdb_id=550, titulo="Original")
+        colecciones.agregar_uno(Favorito, self.usuario, {"id": 550, "title": "Otro título"})
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT xmin FROM {Pelicula._meta.db_table} WHERE id = %s", [pelicula.pk])
+            xmin = cursor.fetchone()[0]
+            colecciones.upsert_pelicula(550, {"title": "Otro título"})
+            cursor.execute(f"SELECT xmin, titulo FROM {Pelicula._meta.db_table} WHERE id = %s", [pelicula.pk])
+            self.assertEqual(cursor.fetchone(), (xmin, "Original"))
@@ -0,0 +1,59 @@
+# cineapp/tests/test_estadisticas.py
+import unittest
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from cineapp import estadisticas
+from cineapp.models import EstadisticasUsuario, Usuario
+
+CACHE_LOCAL = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+CAMPOS = ("vistos", "favoritos", "suma_calificaciones", "calificaciones", "ultima_actividad")
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "SQL propio de PostgreSQL (colecciones)")
+@override_settings(CACHES=CACHE_LOCAL)
+class ContadoresIncrementalesTests(TestCase):
+    """Tras altas, ediciones y bajas por la API, los contadores coinciden con `reconstruir`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user(email="contadores@cinehub.test", password="x")
+
+    def setUp(self):
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(self.usuario)
+
+    def _estadisticas(self):
+        return EstadisticasUsuario.objects.filter(usuario=self.usuario).values(*CAMPOS).get()
+
+    def _comparar_con_reconstruir(self):
+        incrementales = self._estadisticas()
+        estadisticas.reconstruir([self.usuario.pk])
+        self.assertEqual(incrementales, self._estadisticas())
+
+    def _agregar(self, ruta, tmdb_id):
+        respuesta = self.cliente.post(ruta, {"tmdb_id": tmdb_id, "title": f"Película {tmdb_id}"}, format="json")
+        self.assertEqual(respuesta.status_code, 201)
+        return respuesta.json()["id"]
+
+    def test_altas_ediciones_y_bajas(self):
+        vistos = [self._agregar("/api/vistos/", 830000 + i) for i in range(4)]
+        favorito = self._agregar("/api/favoritos/", 830000)
+        self._agregar("/api/favoritos/", 830001)
+        self._comparar_con_reconstruir()
+
+        # Calificaciones con decimales: se guarda el entero y se suma ese mismo entero
+        for visto, calificacion in zip(vistos, (4.7, "3", 5, "2.5")):
+            respuesta = self.cliente.put(f"/api/vistos/{visto}/", {"calificacion": calificacion}, format="json")
+            self.assertEqual(respuesta.status_code, 200)
+        self.cliente.put(f"/api/vistos/{vistos[0]}/", {"calificacion": 1.9}, format="json")
+        self.assertEqual(self._estadisticas()["suma_calificaciones"], 1 + 3 + 5 + 2)
+        self._comparar_con_reconstruir()
+
+        self.assertEqual(self.cliente.delete(f"/api/vistos/{vistos[0]}/").status_code, 204)
+        self.assertEqual(self.cliente.delete(f"/api/vistos/{vistos[3]}/").status_code, 204)
+        self.assertEqual(self.cliente.delete(f"/api/favoritos/{favorito}/").status_code, 204)
+        self._comparar_con_reconstruir()
+        self.assertEqual(self._estadisticas()["vistos"], 2)
@@ -0,0 +1,52 @@
+# cineapp/tests/test_login.py
+from django.contrib.auth.hashers import MD5PasswordHasher
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from cineapp.models import Usuario
+
+CACHE_LOCAL = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class HasherContador(MD5PasswordHasher):
+    """Hasher rápido que cuenta cuántas veces se hashea una contraseña."""
+    llamadas = 0
+
+    def encode(self, password, salt):
+        HasherContador.llamadas += 1
+        return super().encode(password, salt)
+
+
+@override_settings(
+    CACHES=CACHE_LOCAL,
+    LIMITES_ACTIVOS=False,
+    PASSWORD_HASHERS=["cineapp.tests.test_login.HasherContador"],
+)
+class LoginUnHashTests(TestCase):
+    """LoginView hashea una sola vez por intento, exista o no el email (mismo costo, mismo tiempo)."""
+
+    EMAIL = "hash@cinehub.test"
+
+    @classmethod
+    def setUpTestData(cls):
+        Usuario.objects.create_user(email=cls.EMAIL, password="correcta")
+
+    def setUp(self):
+        HasherContador.llamadas = 0
+
+    def _login(self, email, password):
+        return APIClient().post("/api/auth/login/", {"email": email, "password": password})
+
+    def test_login_correcto(self):
+        respuesta = self._login(self.EMAIL, "correcta")
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn("access", respuesta.json())
+        self.assertEqual(HasherContador.llamadas, 1)
+
+    def test_contrasena_incorrecta(self):
+        self.assertEqual(self._login(self.EMAIL, "mala").status_code, 401)
+        self.assertEqual(HasherContador.llamadas, 1)
+
+    def test_email_desconocido(self):
+        self.assertEqual(self._login("nadie@cinehub.test", "correcta").status_code, 401)
+        self.assertEqual(HasherContador.llamadas, 1)
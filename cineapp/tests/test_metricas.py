@@ -0,0 +1,38 @@
+# cineapp/tests/test_metricas.py
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from cineapp import metricas
+from cineapp.models import Usuario
+
+CACHE_LOCAL = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class MetricasTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = Usuario.objects.create_user(email="staff@cinehub.test", password="x", is_staff=True)
+        cls.usuario = Usuario.objects.create_user(email="normal@cinehub.test", password="x")
+
+    def setUp(self):
+        cache.clear()
+
+    def _get(self, usuario):
+        cliente = APIClient()
+        cliente.force_authenticate(usuario)
+        return cliente.get("/api/metricas/")
+
+    def test_solo_staff(self):
+        self.assertEqual(self._get(self.usuario).status_code, 403)
+
+    def test_worker_y_compartidas(self):
+        metricas.observar("tmdb.prueba", 12.0)
+        metricas.incrementar_compartido("coalescencia.lider")
+        datos = self._get(self.staff).json()
+        self.assertGreaterEqual(datos["worker"]["latencias"]["tmdb.prueba"]["max_ms"], 12.0)
+        self.assertGreaterEqual(datos["worker"]["contadores"]["coalescencia.lider"], 1)
+        self.assertEqual(datos["compartidas"]["coalescencia.lider"], 1)
+        self.assertEqual(datos["compartidas"]["coalescencia.espera_agotada"], 0)
@@ -0,0 +1,116 @@
+# cineapp/tests/test_paginacion.py
+import datetime
+import math
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cineapp.models import Favorito, Pelicula, Usuario, Visto
+from cineapp.paginacion import codificar_cursor
+
+CACHE_LOCAL = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class CursorManipuladoTests(TestCase):
+    """Un cursor con valores que no encajan en el orden da 400, no un 500 de la base de datos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user(email="cursor@cinehub.test", password="x")
+        pelicula = Pelicula.objects.create(tmdb_id=810000, titulo="Cursor")
+        Visto.objects.create(usuario=cls.usuario, pelicula=pelicula)
+
+    def setUp(self):
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(self.usuario)
+
+    def _get(self, ruta, valores):
+        cursor = valores if isinstance(valores, str) else codificar_cursor(valores)
+        return self.cliente.get(ruta, {"cursor": cursor})
+
+    def test_cursores_invalidos(self):
+        casos = [
+            ("/api/peliculas/", ["abc"]),
+            ("/api/peliculas/", [{"a": 1}]),
+            ("/api/peliculas/", [None]),
+            ("/api/peliculas/", [1, 2]),
+            ("/api/peliculas/", "no-es-base64!"),
+            ("/api/vistos/", ["garbage", 1]),
+            ("/api/vistos/", ["2024-01-01T10:00:00+00:00", "x"]),
+            ("/api/vistos/", [[1], 1]),
+            ("/api/peliculas/?orden=fecha_lanzamiento", ["2024-13-01", 1]),
+        ]
+        for ruta, valores in casos:
+            with self.subTest(ruta=ruta, valores=valores):
+                respuesta = self._get(ruta, valores)
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertEqual(respuesta.json(), {"error": "Cursor inválido"})
+
+    def test_cursor_valido(self):
+        respuesta = self._get("/api/vistos/", ["2999-01-01T00:00:00+00:00", 1])
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.json()["results"]), 1)
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class RecorridoKeysetTests(TestCase):
+    """Recorrer todas las páginas devuelve cada fila una vez, en orden, también con empates en fecha_visto."""
+
+    N = 23
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user(email="keyset@cinehub.test", password="x")
+        otro = Usuario.objects.create_user(email="otro-keyset@cinehub.test", password="x")
+        peliculas = Pelicula.objects.bulk_create(
+            Pelicula(tmdb_id=840000 + i, titulo=f"Película {i}") for i in range(cls.N)
+        )
+        sin_tmdb = Pelicula.objects.create(titulo="Sin tmdb_id")
+        Visto.objects.bulk_create(Visto(usuario=cls.usuario, pelicula=p) for p in peliculas + [sin_tmdb])
+        Favorito.objects.bulk_create(Favorito(usuario=cls.usuario, pelicula=p) for p in peliculas)
+        Visto.objects.create(usuario=otro, pelicula=peliculas[0])
+        # Grupos de 5 con la misma fecha: los cortes de página caen dentro de los empates
+        base = timezone.now() - datetime.timedelta(days=30)
+        for posicion, visto in enumerate(Visto.objects.filter(usuario=cls.usuario).order_by("id")):
+            Visto.objects.filter(pk=visto.pk).update(fecha_visto=base + datetime.timedelta(hours=posicion // 5))
+
+    def setUp(self):
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(self.usuario)
+
+    def _recorrer(self, ruta, tamano):
+        ids, cursor, paginas = [], None, 0
+        while True:
+            params = {"page_size": tamano, **({"cursor": cursor} if cursor else {})}
+            datos = self.cliente.get(ruta, params).json()
+            self.assertLessEqual(len(datos["results"]), tamano)
+            ids += [r["id"] for r in datos["results"]]
+            paginas += 1
+            cursor = datos["next"]
+            if cursor is None:
+                return ids, paginas
+
+    def test_vistos(self):
+        esperado = list(
+            Visto.objects.filter(usuario=self.usuario).order_by("-fecha_visto", "-id").values_list("id", flat=True)
+        )
+        for tamano in (1, 4, 5, 7, len(esperado), len(esperado) + 1):
+            with self.subTest(tamano=tamano):
+                ids, paginas = self._recorrer("/api/vistos/", tamano)
+                self.assertEqual(ids, esperado)
+                # Se pide una fila de más: un múltiplo exacto no deja una última página vacía
+                self.assertEqual(paginas, math.ceil(len(esperado) / tamano))
+
+    def test_favoritos(self):
+        esperado = list(Favorito.objects.filter(usuario=self.usuario).order_by("-id").values_list("id", flat=True))
+        ids, _ = self._recorrer("/api/favoritos/", 6)
+        self.assertEqual(ids, esperado)
+
+    def test_solo_ids(self):
+        for ruta in ("/api/vistos/", "/api/favoritos/"):
+            with self.subTest(ruta=ruta):
+                datos = self.cliente.get(ruta, {"solo_ids": "1"}).json()
+                self.assertNotIn("next", datos)
+                self.assertEqual(sorted(datos["results"]), [840000 + i for i in range(self.N)])
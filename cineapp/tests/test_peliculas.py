@@ -0,0 +1,46 @@
+# cineapp/tests/test_peliculas.py
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from cineapp.models import Favorito, Pelicula, Usuario, Visto
+from cineapp.serializers import PeliculaSerializer, anotar_pertenencia
+
+CACHE_LOCAL = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class PertenenciaListadoTests(TestCase):
+    """is_favorite / is_watched de un listado cuestan una consulta, no dos por película."""
+
+    N = 30
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user(email="listado@cinehub.test", password="x")
+        cls.peliculas = Pelicula.objects.bulk_create(
+            Pelicula(tmdb_id=800000 + i, titulo=f"Película {i}") for i in range(cls.N)
+        )
+        Favorito.objects.create(usuario=cls.usuario, pelicula=cls.peliculas[0])
+        Visto.objects.create(usuario=cls.usuario, pelicula=cls.peliculas[1])
+
+    def _queryset(self):
+        ids = [p.pk for p in self.peliculas]
+        return anotar_pertenencia(Pelicula.objects.filter(pk__in=ids).order_by("id"), self.usuario)
+
+    def test_serializer_una_consulta(self):
+        with self.assertNumQueries(1):
+            data = PeliculaSerializer(self._queryset(), many=True).data
+        self.assertEqual(len(data), self.N)
+        self.assertEqual([d["is_favorite"] for d in data[:3]], [True, False, False])
+        self.assertEqual([d["is_watched"] for d in data[:3]], [False, True, False])
+
+    def test_listado_peliculas_una_consulta(self):
+        cliente = APIClient()
+        cliente.force_authenticate(self.usuario)
+        with self.assertNumQueries(1):
+            respuesta = cliente.get("/api/peliculas/", {"page_size": 200})
+        self.assertEqual(respuesta.status_code, 200)
+        por_id = {r["id"]: r for r in respuesta.json()["results"]}
+        self.assertTrue(por_id[800000]["is_favorite"])
+        self.assertTrue(por_id[800001]["is_watched"])
+        self.assertFalse(por_id[800002]["is_favorite"] or por_id[800002]["is_watched"])
@@ -0,0 +1,42 @@
+# cineapp/tests/test_respuestas.py
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from cineapp.respuestas import renderizador, respuesta_304_rapida, respuesta_json
+
+CACHE_LOCAL = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=CACHE_LOCAL, RESPUESTA_GZIP_MINIMO=10)
+class EtagPorCodificacionTests(SimpleTestCase):
+    """gzip e identity son bytes distintos: cada una tiene su ETag fuerte."""
+
+    def setUp(self):
+        cache.clear()
+        self.entrada = renderizador("prueba", lambda: {"results": list(range(50))}, 60)()
+        self.fabrica = RequestFactory()
+
+    def _get(self, **cabeceras):
+        return self.fabrica.get("/", headers=cabeceras)
+
+    def test_etags_distintas(self):
+        identidad = respuesta_json(self._get(), self.entrada)
+        comprimida = respuesta_json(self._get(accept_encoding="gzip, br"), self.entrada)
+        self.assertNotIn("Content-Encoding", identidad)
+        self.assertEqual(comprimida["Content-Encoding"], "gzip")
+        self.assertEqual(comprimida["ETag"], identidad["ETag"][:-1] + '-gz"')
+
+    def test_304_solo_con_la_etag_de_esa_codificacion(self):
+        identidad = self.entrada["etag"]
+        comprimida = self.entrada["etag_gzip"]
+        casos = [
+            ({"if_none_match": identidad}, 304),
+            ({"if_none_match": comprimida}, 200),
+            ({"if_none_match": comprimida, "accept_encoding": "gzip"}, 304),
+            ({"if_none_match": identidad, "accept_encoding": "gzip"}, 200),
+        ]
+        for cabeceras, esperado in casos:
+            with self.subTest(**cabeceras):
+                self.assertEqual(respuesta_json(self._get(**cabeceras), self.entrada).status_code, esperado)
+                rapida = respuesta_304_rapida(self._get(**cabeceras), "prueba")
+                self.assertEqual(rapida is not None, esperado == 304)
@@ -0,0 +1,126 @@
+# cineapp/tests/test_suscripciones.py
+import threading
+import unittest
+from datetime import timedelta
+
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from cineapp import suscripciones
+from cineapp.models import HistorialPago, PlanSuscripcion, Suscripcion, Usuario
+
+CACHE_LOCAL = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def _plan(tipo="basico", es_activo=True):
+    plan, _ = PlanSuscripcion.objects.update_or_create(
+        tipo=tipo,
+        defaults={"nombre": tipo, "precio_mensual": "9.99", "descripcion": "", "es_activo": es_activo},
+    )
+    return plan
+
+
+def _vencidas(cantidad, plan, prefijo, automatica=True):
+    """`cantidad` usuarios con una suscripción activa vencida hace un día."""
+    usuarios = Usuario.objects.bulk_create(
+        Usuario(email=f"{prefijo}{i}@cinehub.test") for i in range(cantidad)
+    )
+    return Suscripcion.objects.bulk_create(
+        Suscripcion(
+            usuario=u, plan=plan, fecha_fin=timezone.now() - timedelta(days=1),
+            es_renovacion_automatica=automatica,
+        )
+        for u in usuarios
+    )
+
+
+@override_settings(CACHES=CACHE_LOCAL)
+class ProcesarVencidasTests(TestCase):
+
+    def test_renueva_y_expira(self):
+        renovable = _vencidas(1, _plan(), "renovable")[0]
+        manual = _vencidas(1, _plan(), "manual", automatica=False)[0]
+        retirado = _vencidas(1, _plan("premium", es_activo=False), "retirado")[0]
+
+        self.assertEqual(suscripciones.procesar_vencidas(), (1, 2))
+        renovable.refresh_from_db()
+        self.assertEqual(renovable.estado, "activa")
+        self.assertGreater(renovable.fecha_fin, timezone.now() + timedelta(days=29))
+        self.assertEqual(Suscripcion.objects.get(pk=manual.pk).estado, "expirada")
+        self.assertEqual(Suscripcion.objects.get(pk=retirado.pk).estado, "expirada")
+        self.assertEqual(HistorialPago.objects.filter(suscripcion__in=[manual, retirado]).count(), 0)
+        # Nada pendiente: una segunda pasada no hace nada
+        self.assertEqual(suscripciones.procesar_vencidas(), (0, 0))
+
+    def test_reprocesar_el_mismo_periodo_no_cobra_dos_veces(self):
+        suscripcion = _vencidas(1, _plan(), "idempotente")[0]
+        vencimiento = suscripcion.fecha_fin
+        suscripciones.procesar_vencidas()
+
+        # Como si la renovación del período se reintentara (p.ej. fecha_fin restaurada)
+        Suscripcion.objects.filter(pk=suscripcion.pk).update(fecha_fin=vencimiento)
+        self.assertEqual(suscripciones.procesar_vencidas(), (1, 0))
+
+        pagos = HistorialPago.objects.filter(suscripcion=suscripcion)
+        self.assertEqual(
+            list(pagos.values_list("transaccion_id", flat=True)),
+            [f"REN_{suscripcion.pk}_{int(vencimiento.timestamp())}"],
+        )
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "SKIP LOCKED de PostgreSQL")
+@override_settings(CACHES=CACHE_LOCAL)
+class ProcesarVencidasConcurrenteTests(TransactionTestCase):
+    """Varios procesos a la vez: cada suscripción se procesa (y se cobra) una sola vez."""
+
+    def test_salta_las_filas_bloqueadas(self):
+        vencidas = _vencidas(10, _plan(), "bloqueada")
+        bloqueadas = [s.pk for s in vencidas[:4]]
+        tomadas, liberar = threading.Event(), threading.Event()
+
+        def otro_worker():
+            try:
+                with transaction.atomic():
+                    list(Suscripcion.objects.select_for_update().filter(pk__in=bloqueadas))
+                    tomadas.set()
+                    liberar.wait(10)
+            finally:
+                connections.close_all()
+
+        hilo = threading.Thread(target=otro_worker)
+        hilo.start()
+        try:
+            self.assertTrue(tomadas.wait(10))
+            # Sin esperar al otro worker: solo las 6 libres
+            self.assertEqual(suscripciones.procesar_vencidas(lote=3), (6, 0))
+        finally:
+            liberar.set()
+            hilo.join()
+        self.assertEqual(suscripciones.procesar_vencidas(lote=3), (4, 0))
+        self.assertEqual(HistorialPago.objects.count(), 10)
+
+    def test_dos_workers(self):
+        _vencidas(200, _plan(), "paralelo")
+        barrera = threading.Barrier(2)
+        resultados, errores = [], []
+
+        def worker():
+            try:
+                barrera.wait()
+                resultados.append(suscripciones.procesar_vencidas(lote=7))
+            except Exception as e:
+                errores.append(e)
+            finally:
+                connections.close_all()
+
+        hilos = [threading.Thread(target=worker) for _ in range(2)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        self.assertEqual(sum(r for r, _ in resultados), 200)
+        self.assertEqual(HistorialPago.objects.count(), 200)
+        self.assertFalse(Suscripcion.objects.filter(fecha_fin__lte=timezone.now()).exists())
@@ -0,0 +1,111 @@
+# cineapp/tests/test_throttling.py
+import types
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from cineapp import throttling
+from cineapp.models import Usuario
+
+try:
+    import fakeredis
+    import lupa  # noqa: F401  (fakeredis lo necesita para ejecutar el script Lua)
+except ImportError:
+    fakeredis = None
+
+CACHE_LOCAL = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@unittest.skipIf(fakeredis is None, "hace falta fakeredis con lupa")
+class RedisFalsoMixin:
+    """Redis en memoria y reloj controlado (`self.reloj`, en segundos)."""
+
+    def setUp(self):
+        super().setUp()
+        redis = fakeredis.FakeRedis()
+        self.reloj = 0.0
+        parches = [
+            mock.patch.object(throttling, "get_redis_connection", lambda alias: redis),
+            mock.patch.object(throttling, "_script", None),
+            mock.patch.object(throttling, "time", types.SimpleNamespace(time=lambda: self.reloj)),
+        ]
+        for parche in parches:
+            parche.start()
+            self.addCleanup(parche.stop)
+
+
+@override_settings(LIMITES_ACTIVOS=True, LIMITES_PETICIONES={"prueba": {"ip": "10/s"}})
+class VentanaDeslizanteTests(RedisFalsoMixin, SimpleTestCase):
+
+    def test_ventana_actual_llena(self):
+        self.reloj = 1000.25  # 250 ms dentro de la ventana
+        for _ in range(10):
+            self.assertEqual(throttling.comprobar("prueba", ip="1.2.3.4"), 0)
+        # Hay que esperar a la ventana siguiente (750 ms) y a que las 10 de
+        # esta pesen menos de 9: 1000 * (1 - 9/10) = 100 ms más
+        self.assertEqual(throttling.comprobar("prueba", ip="1.2.3.4"), 0.85)
+        # El rechazo no cuenta
+        self.assertEqual(throttling.comprobar("prueba", ip="1.2.3.4"), 0.85)
+
+    def test_ventana_anterior_ponderada(self):
+        self.reloj = 1000.0
+        for _ in range(10):
+            throttling.comprobar("prueba", ip="1.2.3.4")
+        # A mitad de la ventana siguiente las 10 anteriores pesan 5: caben 5 más
+        self.reloj = 1001.5
+        for _ in range(5):
+            self.assertEqual(throttling.comprobar("prueba", ip="1.2.3.4"), 0)
+        # 10 * (1000 - t) / 1000 + 5 + 1 <= 10 cuando t >= 600 ms: 100 ms más
+        self.assertEqual(throttling.comprobar("prueba", ip="1.2.3.4"), 0.1)
+
+    def test_solo_consulta_y_registrar(self):
+        self.reloj = 1000.0
+        for _ in range(20):
+            self.assertEqual(throttling.comprobar("prueba", solo_consulta=("ip",), ip="1.2.3.4"), 0)
+        for _ in range(10):
+            throttling.registrar("prueba", ip="1.2.3.4")
+        self.assertGreater(throttling.comprobar("prueba", solo_consulta=("ip",), ip="1.2.3.4"), 0)
+
+
+@override_settings(
+    CACHES=CACHE_LOCAL,
+    LIMITES_ACTIVOS=True,
+    LIMITES_PETICIONES={"login": {"cuenta_ip": "3/min", "cuenta": "10/hour"}},
+)
+class LimiteLoginTests(RedisFalsoMixin, TestCase):
+    """Solo los intentos fallidos cuentan contra la cuenta, y por IP."""
+
+    EMAIL = "limite@cinehub.test"
+
+    @classmethod
+    def setUpTestData(cls):
+        Usuario.objects.create_user(email=cls.EMAIL, password="correcta")
+
+    def _login(self, password, ip="10.0.0.1", ruta="/api/auth/login/"):
+        return APIClient().post(ruta, {"email": self.EMAIL, "password": password}, REMOTE_ADDR=ip)
+
+    def test_logins_correctos_no_gastan_el_limite(self):
+        self.reloj = 600.0
+        for _ in range(5):
+            self.assertEqual(self._login("correcta").status_code, 200)
+
+    def test_fallos_bloquean_la_cuenta_desde_esa_ip(self):
+        self.reloj = 610.0  # 10 s dentro del minuto
+        for _ in range(3):
+            self.assertEqual(self._login("mala").status_code, 401)
+
+        respuesta = self._login("correcta")
+        self.assertEqual(respuesta.status_code, 429)
+        # 50 s hasta el minuto siguiente + 60 * (1 - 2/3) = 20 s hasta que los 3 pesen menos de 2
+        self.assertEqual(respuesta["Retry-After"], "70")
+
+        # El dueño, desde su IP, sigue entrando
+        self.assertEqual(self._login("correcta", ip="10.0.0.2").status_code, 200)
+
+    def test_fallos_del_login_jwt_cuentan(self):
+        self.reloj = 600.0
+        for _ in range(3):
+            self.assertEqual(self._login("mala", ruta="/api/auth/login-jwt/").status_code, 401)
+        self.assertEqual(self._login("correcta").status_code, 429)
@@ -0,0 +1,232 @@
+# cineapp/throttling.py
+import logging
+import math
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from . import metricas
+from .authentication import CachedJWTAuthentication
+
+logger = logging.getLogger(__name__)
+
+# ============================
+# Límites de peticiones (ventana deslizante en Redis)
+# ============================
+# Cada límite "cantidad/periodo" se cuenta con dos ventanas fijas consecutivas:
+# la actual y la anterior, ponderada por la fracción que todavía cae dentro de
+# la ventana deslizante. Dos contadores por límite, sin listas de timestamps.
+# Un script Lua comprueba todos los límites de la petición (por usuario, IP o
+# cuenta en todo el ámbito y por ruta, ver LIMITES_PETICIONES) y solo si todos
+# tienen hueco los incrementa: un único EVALSHA por petición y sin carreras
+# entre workers. Los límites por cuenta del login se comprueban en cada intento
+# pero solo se incrementan con los fallidos (`registrar`).
+# Si Redis falla se deja pasar la petición (el límite protege, no es crítico).
+
+PREFIJO = "cinehub:rl"
+
+# KEYS: por límite, contador de la ventana actual y de la anterior.
+# ARGV: ahora (ms), "registrar" (1 = solo incrementar, sin comprobar) y, por
+# límite, cantidad, duración de la ventana (ms) y si la petición cuenta (1/0;
+# con 0 solo se comprueba).
+# Devuelve 0 si la petición entra o los ms hasta que haya hueco.
+_LUA = """
+local ahora = tonumber(ARGV[1])
+local registrar = ARGV[2] == '1'
+local espera = 0
+for i = 1, #KEYS / 2 do
+    local cantidad = tonumber(ARGV[3 * i])
+    local ventana = tonumber(ARGV[3 * i + 1])
+    local actual = tonumber(redis.call('GET', KEYS[2 * i - 1]) or 0)
+    local anterior = tonumber(redis.call('GET', KEYS[2 * i]) or 0)
+    local transcurrido = ahora % ventana
+    if not registrar and anterior * (ventana - transcurrido) / ventana + actual + 1 > cantidad then
+        local libre
+        if actual + 1 > cantidad then
+            -- Hay que esperar a la ventana siguiente y a que esta pese lo bastante poco
+            libre = ventana - transcurrido + ventana * (1 - (cantidad - 1) / actual)
+        else
+            libre = ventana - (cantidad - actual - 1) * ventana / anterior - transcurrido
+        end
+        espera = math.max(espera, math.ceil(libre))
+    end
+end
+if espera > 0 then
+    return espera
+end
+for i = 1, #KEYS / 2 do
+    if ARGV[3 * i + 2] == '1' then
+        redis.call('INCR', KEYS[2 * i - 1])
+        redis.call('PEXPIRE', KEYS[2 * i - 1], 2 * tonumber(ARGV[3 * i + 1]))
+    end
+end
+return 0
+"""
+
+_PERIODOS = {"s": 1000, "m": 60_000, "h": 3_600_000, "d": 86_400_000}
+
+_script = None
+
+
+@lru_cache(maxsize=64)
+def parsear(limites):
+    """Convierte "10/s,300/min" en ((10, 1000), (300, 60000)). Vacío = sin límites."""
+    resultado = []
+    for limite in (limites or "").split(","):
+        limite = limite.strip()
+        if not limite:
+            continue
+        cantidad, periodo = limite.split("/")
+        resultado.append((int(cantidad), _PERIODOS[periodo.strip()[0]]))
+    return tuple(resultado)
+
+
+def _ejecutar(claves, argumentos):
+    global _script
+    conexion = get_redis_connection("default")
+    if _script is None:
+        _script = conexion.register_script(_LUA)
+    return _script(keys=claves, args=argumentos, client=conexion)
+
+
+def _evaluar(scope, identidades, solo_consulta=(), solo_registrar=False):
+    config = settings.LIMITES_PETICIONES.get(scope)
+    if not settings.LIMITES_ACTIVOS or not config:
+        return 0
+
+    ahora = int(time.time() * 1000)
+    claves = []
+    argumentos = [ahora, int(solo_registrar)]
+    for dimension, identidad in identidades.items():
+        if identidad is None:
+            continue
+        for cantidad, ventana in parsear(config.get(dimension)):
+            bloque = ahora // ventana
+            base = f"{PREFIJO}:{scope}:{dimension}:{identidad}:{ventana}"
+            claves += [f"{base}:{bloque}", f"{base}:{bloque - 1}"]
+            argumentos += [cantidad, ventana, int(dimension not in solo_consulta)]
+    if not claves:
+        return 0
+
+    try:
+        espera = _ejecutar(claves, argumentos)
+    except Exception:
+        metricas.incrementar("limites.error")
+        logger.warning("No se pudo comprobar el límite '%s'; se deja pasar", scope, exc_info=True)
+        return 0
+    if espera:
+        metricas.incrementar(f"limites.{scope}.rechazada")
+        return espera / 1000
+    return 0
+
+
+def comprobar(scope, solo_consulta=(), **identidades):
+    """
+    Cuenta la petición contra los límites del ámbito `scope`. `identidades`
+    trae el valor de cada dimensión (ruta=, ip=, usuario=, ...; None si no
+    aplica); las de `solo_consulta` se comprueban pero no se incrementan.
+    Devuelve 0 si entra o los segundos hasta que haya hueco (para
+    Retry-After); en ese caso no se cuenta.
+    """
+    return _evaluar(scope, identidades, solo_consulta)
+
+
+def registrar(scope, **identidades):
+    """Suma uno a esos límites sin comprobarlos (p.ej. un login fallido)."""
+    _evaluar(scope, identidades, solo_registrar=True)
+
+
+def _ruta(request):
+    # Patrón de la URL (tmdb/detalle/<int:movie_id>/), no la ruta concreta
+    coincidencia = getattr(request, "resolver_match", None)
+    return getattr(coincidencia, "route", None) or request.path
+
+
+def _identidades(request, usuario_id):
+    # get_ident respeta NUM_PROXIES: con 0 es REMOTE_ADDR, el X-Forwarded-For del cliente no cuenta
+    return {"ruta": _ruta(request), "ip": BaseThrottle().get_ident(request), "usuario": usuario_id}
+
+
+class LimiteDeslizante(BaseThrottle):
+    """Throttle de DRF sobre `comprobar`. Usar una de las subclases (definen `scope`)."""
+    scope = None
+
+    def identidades(self, request):
+        usuario = getattr(request, "user", None)
+        usuario_id = usuario.pk if usuario is not None and usuario.is_authenticated else None
+        return _identidades(request, usuario_id)
+
+    def allow_request(self, request, view):
+        self.espera = comprobar(self.scope, **self.identidades(request))
+        return not self.espera
+
+    def wait(self):
+        # DRF responde 429 con Retry-After a partir de este valor
+        return self.espera
+
+
+def _email(request):
+    email = request.data.get("email") if hasattr(request.data, "get") else None
+    if isinstance(email, str) and email.strip():
+        return email.strip().lower()
+    return None
+
+
+def _cuentas(request):
+    # Solo cuentan los intentos fallidos. `cuenta_ip` (email + IP) es el límite
+    # estricto: un tercero que conoce el email no bloquea los logins del dueño
+    # desde su propia IP. `cuenta` (email desde cualquier IP) es un techo laxo
+    # contra el ataque repartido entre muchas IPs.
+    email = _email(request)
+    if email is None:
+        return {}
+    return {"cuenta": email, "cuenta_ip": f"{email}|{BaseThrottle().get_ident(request)}"}
+
+
+class LimiteLogin(LimiteDeslizante):
+    """Además de la IP, limita los fallos por cuenta (ver `registrar_fallo`)."""
+    scope = "login"
+    POR_FALLOS = ("cuenta", "cuenta_ip")
+
+    def allow_request(self, request, view):
+        identidades = {**self.identidades(request), **_cuentas(request)}
+        self.espera = comprobar(self.scope, solo_consulta=self.POR_FALLOS, **identidades)
+        return not self.espera
+
+    @classmethod
+    def registrar_fallo(cls, request):
+        """Las vistas de login lo llaman cuando las credenciales no son válidas."""
+        cuentas = _cuentas(request)
+        if cuentas:
+            registrar(cls.scope, **cuentas)
+
+
+class LimiteTMDb(LimiteDeslizante):
+    scope = "tmdb"
+
+
+def _usuario_del_token(request):
+    # Las vistas async no pasan por la autenticación de DRF: se valida el
+    # Bearer solo para saber a qué usuario contar (token inválido = anónimo)
+    autenticacion = CachedJWTAuthentication()
+    cabecera = autenticacion.get_header(request)
+    crudo = autenticacion.get_raw_token(cabecera) if cabecera is not None else None
+    if crudo is None:
+        return None
+    try:
+        token = autenticacion.get_validated_token(crudo)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def limitar(request, scope):
+    """Para vistas que no son de DRF (views_async): segundos de Retry-After, o 0 si la petición entra."""
+    espera = comprobar(scope, **_identidades(request, _usuario_del_token(request)))
+    return max(1, math.ceil(espera)) if espera else 0
@@ -0,0 +1,258 @@
+# cineapp/tmdb_client.py
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+
+import httpx
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import metricas
+from .cache_utils import en_hilo
+
+logger = logging.getLogger(__name__)
+
+TMDB_BASE_URL = settings.TMDB_BASE_URL
+STATUS_REINTENTABLES = (429, 500, 502, 503, 504)
+# Tope (segundos) para el Retry-After de TMDb, en la sesión sync y en la async
+RETRY_AFTER_MAXIMO = 10
+
+_local = threading.local()
+_clientes_async = weakref.WeakKeyDictionary()
+
+
+class TMDbError(Exception):
+    """Error de red al hablar con TMDb (timeout, conexión rechazada, etc.)."""
+
+
+class CircuitoAbierto(TMDbError):
+    """El circuito de esa familia de endpoints está abierto: se falla sin llamar a TMDb."""
+
+
+class RetryConJitter(Retry):
+    """Backoff exponencial de urllib3 más un jitter aleatorio para no sincronizar reintentos."""
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return backoff + random.uniform(0, settings.TMDB_RETRY_JITTER)
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, RETRY_AFTER_MAXIMO)
+
+
+# ============================
+# Sesión HTTP
+# ============================
+
+def _crear_session():
+    retry = RetryConJitter(
+        total=settings.TMDB_RETRY_TOTAL,
+        # Un read timeout no se reintenta: TMDb ya tuvo todo el timeout de
+        # lectura y repetirlo multiplica el tiempo que se bloquea el worker
+        read=0,
+        backoff_factor=settings.TMDB_RETRY_BACKOFF,
+        status_forcelist=STATUS_REINTENTABLES,
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.TMDB_POOL_CONNECTIONS,
+        pool_maxsize=settings.TMDB_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept": "application/json"})
+    return session
+
+
+def get_session():
+    """Sesión con pool de conexiones reutilizada por cada hilo del worker."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _crear_session()
+        _local.session = session
+    return session
+
+
+def get_cliente_async():
+    """Cliente httpx con pool compartido por todas las corrutinas del event loop."""
+    loop = asyncio.get_running_loop()
+    cliente = _clientes_async.get(loop)
+    if cliente is None:
+        cliente = httpx.AsyncClient(
+            base_url=TMDB_BASE_URL,
+            headers={"Accept": "application/json"},
+            limits=httpx.Limits(
+                max_connections=settings.TMDB_ASYNC_MAX_CONEXIONES,
+                max_keepalive_connections=settings.TMDB_POOL_MAXSIZE,
+            ),
+        )
+        _clientes_async[loop] = cliente
+    return cliente
+
+
+def timeout_para(endpoint):
+    timeouts = settings.TMDB_TIMEOUTS
+    return timeouts.get(endpoint, timeouts["default"])
+
+
+# ============================
+# Circuit breaker (estado compartido en Redis)
+# ============================
+# Cerrado: las llamadas pasan y los fallos se cuentan en una ventana.
+# Abierto: al llegar a TMDB_CIRCUITO_UMBRAL fallos se falla al instante durante
+# TMDB_CIRCUITO_ENFRIAMIENTO segundos.
+# Semiabierto: pasado el enfriamiento un único worker hace de sonda; si la sonda
+# falla el circuito se vuelve a abrir, si funciona se cierra.
+
+def _claves_circuito(familia):
+    base = f"tmdb_circuito_{familia}"
+    return f"{base}_abierto", f"{base}_semiabierto", f"{base}_fallos", f"{base}_sonda"
+
+
+def _abrir_circuito(familia):
+    abierto, semiabierto, fallos, _ = _claves_circuito(familia)
+    enfriamiento = settings.TMDB_CIRCUITO_ENFRIAMIENTO
+    cache.set(abierto, 1, enfriamiento)
+    cache.set(semiabierto, 1, enfriamiento * 10)
+    cache.delete(fallos)
+    metricas.incrementar(f"tmdb.{familia}.circuito_abierto")
+    logger.warning("Circuito TMDb '%s' abierto por %ss", familia, enfriamiento)
+
+
+def _cerrar_circuito(familia):
+    _, semiabierto, fallos, sonda = _claves_circuito(familia)
+    cache.delete_many([semiabierto, fallos, sonda])
+    logger.info("Circuito TMDb '%s' cerrado", familia)
+
+
+def _registrar_fallo(familia, es_sonda):
+    if es_sonda:
+        _abrir_circuito(familia)
+        return
+    _, _, fallos, _ = _claves_circuito(familia)
+    cache.add(fallos, 0, settings.TMDB_CIRCUITO_VENTANA)
+    try:
+        total = cache.incr(fallos)
+    except ValueError:
+        # La ventana expiró entre el add y el incr
+        total = 1
+        cache.set(fallos, total, settings.TMDB_CIRCUITO_VENTANA)
+    if total >= settings.TMDB_CIRCUITO_UMBRAL:
+        _abrir_circuito(familia)
+
+
+def _permitir_llamada(familia):
+    """Devuelve True si esta llamada es la sonda del estado semiabierto; lanza CircuitoAbierto si no puede pasar."""
+    abierto, semiabierto, _, sonda = _claves_circuito(familia)
+    estado = cache.get_many([abierto, semiabierto])
+    if abierto in estado:
+        metricas.incrementar(f"tmdb.{familia}.rechazada")
+        raise CircuitoAbierto(f"Circuito TMDb '{familia}' abierto")
+    if semiabierto in estado:
+        connect, read = timeout_para(familia)
+        if not cache.add(sonda, 1, int(connect + read) + 1):
+            metricas.incrementar(f"tmdb.{familia}.rechazada")
+            raise CircuitoAbierto(f"Circuito TMDb '{familia}' probando recuperación")
+        return True
+    return False
+
+
+# ============================
+# Peticiones
+# ============================
+
+def get(path, params=None, endpoint="default"):
+    """
+    GET a TMDb reutilizando la sesión del worker.
+    Devuelve el `requests.Response` final (tras los reintentos) o lanza TMDbError
+    (CircuitoAbierto si el circuito del endpoint no deja pasar la llamada).
+    """
+    es_sonda = _permitir_llamada(endpoint)
+    query = {"api_key": settings.TMDB_API_KEY, "language": "es-ES"}
+    if params:
+        query.update(params)
+
+    inicio = time.perf_counter()
+    status = "error"
+    try:
+        res = get_session().get(f"{TMDB_BASE_URL}{path}", params=query, timeout=timeout_para(endpoint))
+    except requests.RequestException as e:
+        _registrar_fallo(endpoint, es_sonda)
+        raise TMDbError(str(e)) from e
+    else:
+        status = res.status_code
+        if status == 429 or status >= 500:
+            _registrar_fallo(endpoint, es_sonda)
+        elif es_sonda:
+            _cerrar_circuito(endpoint)
+        return res
+    finally:
+        duracion = (time.perf_counter() - inicio) * 1000
+        metricas.observar(f"tmdb.{endpoint}", duracion)
+        logger.info("tmdb %s %s %s %.1fms", endpoint, path, status, duracion)
+
+
+def _espera_reintento(intento, retry_after=None):
+    if retry_after and retry_after.isdigit():
+        return min(int(retry_after), RETRY_AFTER_MAXIMO)
+    return settings.TMDB_RETRY_BACKOFF * (2 ** intento) + random.uniform(0, settings.TMDB_RETRY_JITTER)
+
+
+async def aget(path, params=None, endpoint="default"):
+    """Versión asíncrona de `get` (httpx) con los mismos reintentos, timeouts y circuito."""
+    es_sonda = await en_hilo(_permitir_llamada)(endpoint)
+    query = {"api_key": settings.TMDB_API_KEY, "language": "es-ES"}
+    if params:
+        query.update(params)
+    connect, read = timeout_para(endpoint)
+    timeout = httpx.Timeout(read, connect=connect)
+    cliente = get_cliente_async()
+
+    inicio = time.perf_counter()
+    status = "error"
+    try:
+        for intento in range(settings.TMDB_RETRY_TOTAL + 1):
+            ultimo = intento == settings.TMDB_RETRY_TOTAL
+            try:
+                res = await cliente.get(path, params=query, timeout=timeout)
+            except httpx.ReadTimeout:
+                # Igual que read=0 en la sesión sync: no se repite un timeout de lectura
+                raise
+            except httpx.TransportError:
+                if ultimo:
+                    raise
+                await asyncio.sleep(_espera_reintento(intento))
+                continue
+            if res.status_code in STATUS_REINTENTABLES and not ultimo:
+                await asyncio.sleep(_espera_reintento(intento, res.headers.get("Retry-After")))
+                continue
+            break
+    except httpx.HTTPError as e:
+        await en_hilo(_registrar_fallo)(endpoint, es_sonda)
+        raise TMDbError(str(e)) from e
+    else:
+        status = res.status_code
+        if status == 429 or status >= 500:
+            await en_hilo(_registrar_fallo)(endpoint, es_sonda)
+        elif es_sonda:
+            await en_hilo(_cerrar_circuito)(endpoint)
+        return res
+    finally:
+        duracion = (time.perf_counter() - inicio) * 1000
+        metricas.observar(f"tmdb.{endpoint}", duracion)
+        logger.info("tmdb %s %s %s %.1fms", endpoint, path, status, duracion)
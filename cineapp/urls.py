@@ -1,6 +1,7 @@
 # cineapp/urls.py
+from django.conf import settings
 from django.urls import path
-from cineapp import views
+from cineapp import views, views_async
 from cineapp.views_jwt import EmailTokenObtainPairView, ProfileView as ProfileStatsView
 from cineapp.views_auth import (
     RegisterView, LoginView, LogoutView, ProfileView,
@@ -9,14 +10,18 @@ from cineapp.views_auth import (
 )
 from rest_framework_simplejwt.views import TokenRefreshView
 
+# En modo ASGI las rutas de TMDb se sirven con las vistas async
+tmdb_views = views_async if settings.TMDB_VISTAS_ASYNC else views
+
 urlpatterns = [
     # ====================
     # TMDB
     # ====================
-    path("api/tmdb/detalle/<int:movie_id>/", views.tmdb_detalle, name="tmdb_detalle"),
-    path("tmdb/populares/", views.tmdb_populares, name="tmdb_populares"),
-    path("tmdb/buscar/", views.tmdb_buscar, name="tmdb_buscar"),
-    path("tmdb/estrenos/", views.tmdb_estrenos, name="tmdb_estrenos"),
+    path("api/tmdb/detalle/<int:movie_id>/", tmdb_views.tmdb_detalle, name="tmdb_detalle"),
+    path("tmdb/populares/", tmdb_views.tmdb_populares, name="tmdb_populares"),
+    path("tmdb/buscar/", tmdb_views.tmdb_buscar, name="tmdb_buscar"),
+    path("tmdb/autocomplete/", tmdb_views.tmdb_autocomplete, name="tmdb_autocomplete"),
+    path("tmdb/estrenos/", tmdb_views.tmdb_estrenos, name="tmdb_estrenos"),
 
     # ====================
     # Autenticación
@@ -38,6 +43,7 @@ urlpatterns = [
     # Usuarios
     # ====================
     path("usuarios/", views.usuarios, name="usuarios"),
+    path("usuarios/exportar/", views.usuarios_exportar, name="usuarios_exportar"),
     path("usuarios/<int:pk>/", views.usuario_detalle, name="usuario_detalle"),
     path("update-profile/", views.update_profile, name="update_profile"),
 
@@ -51,8 +57,10 @@ urlpatterns = [
     # Favoritos y Vistos
     # ====================
     path("favoritos/", views.favoritos, name="favoritos"),
+    path("favoritos/bulk/", views.favoritos_bulk, name="favoritos_bulk"),
     path("favoritos/<int:pk>/", views.favorito_detalle, name="favorito_detalle"),
     path("vistos/", views.vistos, name="vistos"),
+    path("vistos/bulk/", views.vistos_bulk, name="vistos_bulk"),
     path("vistos/<int:pk>/", views.visto_detalle, name="visto_detalle"),
 
     # ====================
@@ -62,4 +70,9 @@ urlpatterns = [
     path("subscription/", SuscripcionUsuarioView.as_view(), name="suscripcion_usuario"),
     path("subscription/cancel/", CancelarSuscripcionView.as_view(), name="cancelar_suscripcion"),
     path("subscription/payments/", HistorialPagosView.as_view(), name="historial_pagos"),
+
+    # ====================
+    # Métricas
+    # ====================
+    path("metricas/", views.ver_metricas, name="metricas"),
 ]
@@ -1,17 +1,31 @@
 # cineapp/views.py
-from rest_framework.decorators import api_view, permission_classes
+import csv
+import os
+import itertools
+import json
+
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+from django.http import StreamingHttpResponse
 from django.conf import settings
 from django.shortcuts import get_object_or_404
-import requests
 
-from .models import Pelicula, Usuario, Favorito, Visto
-from .serializers import UsuarioRegisterSerializer, UsuarioSerializer
+from . import autocompletado, colecciones, metricas, tmdb_client
+from .busqueda import CAMPOS_LISTADO, buscar_local, paginas
+from .cache_utils import guardar_con_respaldo, obtener_coalescido, obtener_respaldo, obtener_swr
+from .models import Pelicula, Usuario, Favorito, Visto, Suscripcion
+from .paginacion import CursorInvalido, paginar_keyset, tamano_pagina
+from .respuestas import renderizador, respuesta_304_rapida, respuesta_json
+from .serializers import (
+    UsuarioRegisterSerializer, UsuarioSerializer, anotar_pertenencia, con_suscripcion_activa,
+)
+from .throttling import LimiteTMDb
 
-TMDB_BASE_URL = "https://api.themoviedb.org/3"
-TMDB_API_KEY = settings.TMDB_API_KEY
+# Marca del cache negativo de tmdb_detalle (id inexistente en TMDb)
+NO_ENCONTRADA = "__no_encontrada__"
 
 # ============================
 # Helpers
@@ -28,6 +42,22 @@ def normalize_movie(movie):
         "genre_ids": movie.get("genre_ids", []),
     }
 
+def normalize_movie_detail(detalle):
+    creditos = detalle.get("credits") or {}
+    actores = [actor["name"] for actor in creditos.get("cast", [])[:5]]
+    director = next((c["name"] for c in creditos.get("crew", []) if c.get("job") == "Director"), "Desconocido")
+    return {
+        "id": detalle.get("id"),
+        "titulo": detalle.get("title"),
+        "descripcion": detalle.get("overview"),
+        "poster": f"https://image.tmdb.org/t/p/w500{detalle.get('poster_path')}" if detalle.get("poster_path") else None,
+        "fecha_lanzamiento": detalle.get("release_date"),
+        "duracion": detalle.get("runtime"),
+        "generos": [g["name"] for g in detalle.get("genres", [])],
+        "actores": actores,
+        "director": director,
+    }
+
 def normalize_movie_from_model(pelicula: Pelicula):
     return {
         "id": pelicula.tmdb_id,
@@ -35,20 +65,61 @@ def normalize_movie_from_model(pelicula: Pelicula):
         "overview": pelicula.descripcion,
         "poster_path": pelicula.poster,
         "release_date": pelicula.fecha_lanzamiento,
-        "vote_average": 0,
-        "genre_ids": [],
+        "vote_average": pelicula.vote_average,
+        "genre_ids": pelicula.genre_ids,
+    }
+
+def _pelicula_con_pertenencia(pelicula):
+    """normalize_movie_from_model más is_favorite/is_watched de anotar_pertenencia."""
+    return {
+        **normalize_movie_from_model(pelicula),
+        "is_favorite": pelicula.is_favorite,
+        "is_watched": pelicula.is_watched,
     }
 
+# ============================
+# Listados paginados
+# ============================
+
+# Columnas de Pelicula necesarias al listar Favorito/Visto con select_related
+CAMPOS_PELICULA_RELACIONADA = ["pelicula", *(f"pelicula__{c}" for c in CAMPOS_LISTADO)]
+
+
+def _listado_paginado(request, qs, orden, serializar):
+    """Respuesta {"results", "next"} paginada por cursor (ver cineapp/paginacion.py)."""
+    try:
+        elementos, siguiente = paginar_keyset(qs, orden, request.GET.get("cursor"), tamano_pagina(request))
+    except CursorInvalido as e:
+        return Response({"error": str(e)}, status=400)
+    return Response({"results": [serializar(e) for e in elementos], "next": siguiente})
+
+
+def _solo_ids(qs):
+    """?solo_ids=1: solo los tmdb_id, para clientes que solo necesitan saber la pertenencia."""
+    return Response({"results": list(qs.filter(pelicula__tmdb_id__isnull=False).values_list("pelicula__tmdb_id", flat=True))})
+
 # ============================
 # Películas (CRUD local)
 # ============================
 
+# ?orden= admitidos en el listado; el último campo desempata (índice en models.Pelicula)
+ORDENES_PELICULAS = {
+    "id": ["id"],
+    "fecha_lanzamiento": ["-fecha_lanzamiento", "-id"],
+}
+
 @api_view(["GET", "POST"])
 def peliculas(request):
     if request.method == "GET":
-        peliculas = Pelicula.objects.all()
-        data = [normalize_movie_from_model(p) for p in peliculas]
-        return Response(data)
+        orden = request.GET.get("orden", "id")
+        if orden not in ORDENES_PELICULAS:
+            return Response({"error": "orden debe ser 'id' o 'fecha_lanzamiento'"}, status=400)
+
+        # is_favorite / is_watched salen en la misma consulta (subconsultas Exists)
+        qs = anotar_pertenencia(Pelicula.objects.only("id", *CAMPOS_LISTADO), request.user)
+        if orden == "fecha_lanzamiento":
+            qs = qs.filter(fecha_lanzamiento__isnull=False)
+        return _listado_paginado(request, qs, ORDENES_PELICULAS[orden], _pelicula_con_pertenencia)
 
     elif request.method == "POST":
         data = request.data
@@ -92,8 +163,8 @@ def usuarios(request):
     if request.method == "GET":
         if not request.user.is_authenticated or not request.user.is_staff:
             return Response({"error": "Solo administradores pueden listar usuarios"}, status=403)
-        usuarios = Usuario.objects.all()
-        return Response(UsuarioSerializer(usuarios, many=True).data)
+        usuarios = con_suscripcion_activa(_filtrar_usuarios(request.GET))
+        return _listado_paginado(request, usuarios, ["id"], lambda u: UsuarioSerializer(u).data)
 
     elif request.method == "POST":
         serializer = UsuarioRegisterSerializer(data=request.data)
@@ -103,6 +174,74 @@ def usuarios(request):
         return Response(serializer.errors, status=400)
 
 
+COLUMNAS_EXPORTACION = [
+    "id", "email", "nombre", "is_active", "is_staff", "fecha_registro", "pais", "plan", "suscripcion_fin",
+]
+
+
+def _filtrar_usuarios(params):
+    """Filtros del listado/exportación: ?q= (email o nombre), ?is_active=, ?is_staff= y ?plan= (tipo)."""
+    usuarios = Usuario.objects.all()
+    q = params.get("q", "").strip()
+    if q:
+        usuarios = usuarios.filter(Q(email__icontains=q) | Q(nombre__icontains=q))
+    for campo in ("is_active", "is_staff"):
+        valor = params.get(campo)
+        if valor is not None:
+            usuarios = usuarios.filter(**{campo: valor.lower() in ("1", "true")})
+    plan = params.get("plan")
+    if plan:
+        usuarios = usuarios.filter(
+            Exists(Suscripcion.objects.filter(usuario=OuterRef("pk"), estado="activa", plan__tipo=plan))
+        )
+    return usuarios
+
+
+def _fila_exportacion(usuario):
+    suscripcion = usuario.suscripciones_activas[0] if usuario.suscripciones_activas else None
+    if suscripcion and not suscripcion.esta_activa:
+        suscripcion = None
+    return [
+        usuario.id, usuario.email, usuario.nombre, usuario.is_active, usuario.is_staff,
+        usuario.fecha_registro.isoformat(), usuario.pais,
+        suscripcion.plan.tipo if suscripcion else None,
+        suscripcion.fecha_fin.isoformat() if suscripcion else None,
+    ]
+
+
+class _Eco:
+    """Buffer mínimo para que csv.writer devuelva cada línea en vez de acumularla."""
+
+    def write(self, valor):
+        return valor
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def usuarios_exportar(request):
+    """Exportación en streaming (?formato=csv|ndjson): lotes de iterator(), nunca la tabla entera en memoria."""
+    if not request.user.is_staff:
+        return Response({"error": "Solo administradores pueden exportar usuarios"}, status=403)
+    formato = request.GET.get("formato", "csv")
+    if formato not in ("csv", "ndjson"):
+        return Response({"error": "formato debe ser 'csv' o 'ndjson'"}, status=400)
+
+    usuarios = con_suscripcion_activa(_filtrar_usuarios(request.GET).order_by("id")).only(
+        "id", "email", "nombre", "is_active", "is_staff", "fecha_registro", "pais"
+    )
+    filas = (_fila_exportacion(u) for u in usuarios.iterator(chunk_size=settings.EXPORTACION_LOTE))
+
+    if formato == "csv":
+        escritor = csv.writer(_Eco())
+        lineas = itertools.chain([escritor.writerow(COLUMNAS_EXPORTACION)], (escritor.writerow(f) for f in filas))
+        respuesta = StreamingHttpResponse(lineas, content_type="text/csv; charset=utf-8")
+    else:
+        lineas = (json.dumps(dict(zip(COLUMNAS_EXPORTACION, f)), ensure_ascii=False) + "\n" for f in filas)
+        respuesta = StreamingHttpResponse(lineas, content_type="application/x-ndjson")
+    respuesta["Content-Disposition"] = f'attachment; filename="usuarios.{formato}"'
+    return respuesta
+
+
 @api_view(["GET", "PUT", "DELETE"])
 @permission_classes([IsAuthenticated])
 def usuario_detalle(request, pk):
@@ -132,27 +271,67 @@ def usuario_detalle(request, pk):
 # TMDb - Populares, Buscar, Detalle, Estrenos
 # ============================
 
+def _cargar_lista_tmdb(path, endpoint):
+    try:
+        res = tmdb_client.get(path, {"page": 1}, endpoint=endpoint)
+    except tmdb_client.TMDbError:
+        return None
+    if res.status_code != 200:
+        return None
+    return [normalize_movie(m) for m in res.json().get("results", [])]
+
+
+def _cargar_lista_local(**filtros):
+    """Lista servida desde el espejo local (`sincronizar_catalogo`); None si está vacío."""
+    if not settings.TMDB_CATALOGO_LOCAL:
+        return None
+    peliculas = Pelicula.objects.filter(fecha_sincronizacion__isnull=False, **filtros).order_by("-popularidad")[:20]
+    return [normalize_movie_from_model(p) for p in peliculas] or None
+
+
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@throttle_classes([LimiteTMDb])
 def tmdb_populares(request):
-    cache_key = "tmdb_populares"
-    cached = cache.get(cache_key)
-    if cached:
-        return Response(cached)
-
-    url = f"{TMDB_BASE_URL}/movie/popular"
-    params = {"api_key": TMDB_API_KEY, "language": "es-ES", "page": 1}
-    res = requests.get(url, params=params, timeout=10)
-    if res.status_code == 200:
-        data = res.json()
-        movies = [normalize_movie(m) for m in data.get("results", [])]
-        cache.set(cache_key, movies, 3600)
-        return Response(movies)
-    return Response({"error": "No se pudo obtener"}, status=400)
+    cache_key = "tmdb_populares_json"
+    no_modificado = respuesta_304_rapida(request, cache_key)
+    if no_modificado:
+        return no_modificado
+
+    entrada = obtener_swr(
+        cache_key,
+        renderizador(
+            cache_key,
+            lambda: _cargar_lista_local() or _cargar_lista_tmdb("/movie/popular", "populares"),
+            settings.TMDB_LISTAS_SOFT_TTL,
+        ),
+        settings.TMDB_LISTAS_SOFT_TTL,
+        settings.TMDB_LISTAS_HARD_TTL,
+    )
+    if entrada is None:
+        return Response({"error": "No se pudo obtener"}, status=400)
+    return respuesta_json(request, entrada)
+
+
+def _cargar_busqueda_tmdb(query, page):
+    try:
+        res = tmdb_client.get("/search/movie", {"query": query, "page": page}, endpoint="buscar")
+    except tmdb_client.TMDbError:
+        return None
+    if res.status_code != 200:
+        return None
+    data = res.json()
+    return {
+        "results": [normalize_movie(m) for m in data.get("results", [])],
+        "total_pages": data.get("total_pages", 1),
+        "total_results": data.get("total_results", 0),
+        "page": int(page),
+    }
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@throttle_classes([LimiteTMDb])
 def tmdb_buscar(request):
     query = request.GET.get("q", "").strip()
     page = request.GET.get("page", "1")
@@ -160,76 +339,101 @@ def tmdb_buscar(request):
     if not query or len(query) < 2:
         return Response({"error": "Debes enviar ?q con al menos 2 caracteres"}, status=400)
 
-    cache_key = f"tmdb_search_{query}_{page}"
-    cached = cache.get(cache_key)
-    if cached:
-        return Response(cached)
+    # Primero el catálogo local; TMDb solo si la cobertura local es baja
+    if settings.BUSQUEDA_LOCAL and page.isdigit() and int(page) >= 1:
+        peliculas, total = buscar_local(query, int(page))
+        if total >= settings.BUSQUEDA_LOCAL_MIN_RESULTADOS:
+            return Response({
+                "results": [normalize_movie_from_model(p) for p in peliculas],
+                "total_pages": paginas(total),
+                "total_results": total,
+                "page": int(page),
+            })
+
+    cache_key = f"tmdb_search_json_{query.lower()}_{page}"
+    no_modificado = respuesta_304_rapida(request, cache_key)
+    if no_modificado:
+        return no_modificado
+
+    entrada = obtener_coalescido(
+        cache_key,
+        renderizador(cache_key, lambda: _cargar_busqueda_tmdb(query, page), settings.TMDB_BUSCAR_TTL),
+        settings.TMDB_BUSCAR_TTL,
+        espera_max=settings.TMDB_COALESCENCIA_ESPERA,
+    )
+    if entrada is None:
+        return Response({"error": "No se pudo obtener"}, status=400)
+    return respuesta_json(request, entrada)
 
-    url = f"{TMDB_BASE_URL}/search/movie"
-    params = {"api_key": TMDB_API_KEY, "language": "es-ES", "query": query, "page": page}
-    res = requests.get(url, params=params, timeout=10)
-    if res.status_code == 200:
-        data = res.json()
-        movies = [normalize_movie(m) for m in data.get("results", [])]
-        result = {
-            "results": movies,
-            "total_pages": data.get("total_pages", 1),
-            "total_results": data.get("total_results", 0),
-            "page": int(page),
-        }
-        cache.set(cache_key, result, 1800)
-        return Response(result)
-    return Response({"error": "No se pudo obtener"}, status=400)
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@throttle_classes([LimiteTMDb])
+def tmdb_autocomplete(request):
+    query = request.GET.get("q", "").strip()
+    if len(query) < autocompletado.MIN_PREFIJO:
+        return Response({"error": "Debes enviar ?q con al menos 2 caracteres"}, status=400)
+    return Response({"results": autocompletado.sugerir(query)})
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@throttle_classes([LimiteTMDb])
 def tmdb_detalle(request, movie_id):
+    cache_key = f"tmdb_detalle_{movie_id}"
+    cached = cache.get(cache_key)
+    if cached == NO_ENCONTRADA:
+        return Response({"error": "Película no encontrada"}, status=404)
+    if cached:
+        return Response(cached)
+
+    try:
+        # Detalle + créditos en un solo viaje gracias a append_to_response
+        res = tmdb_client.get(f"/movie/{movie_id}", {"append_to_response": "credits"}, endpoint="detalle")
+    except tmdb_client.TMDbError:
+        res = None
+
+    if res is not None and res.status_code == 404:
+        # Cache negativo corto para no volver a consultar ids inexistentes
+        cache.set(cache_key, NO_ENCONTRADA, settings.TMDB_NEGATIVO_TTL)
+        return Response({"error": "Película no encontrada"}, status=404)
+    if res is None or res.status_code != 200:
+        respaldo = obtener_respaldo(cache_key)
+        if respaldo:
+            return Response(respaldo)
+        return Response({"error": "No se pudo obtener"}, status=400)
+
     try:
-        detalle_url = f"{TMDB_BASE_URL}/movie/{movie_id}"
-        detalle_params = {"api_key": TMDB_API_KEY, "language": "es-ES"}
-        detalle_res = requests.get(detalle_url, params=detalle_params).json()
-
-        creditos_url = f"{TMDB_BASE_URL}/movie/{movie_id}/credits"
-        creditos_params = {"api_key": TMDB_API_KEY, "language": "es-ES"}
-        creditos_res = requests.get(creditos_url, params=creditos_params).json()
-
-        actores = [actor["name"] for actor in creditos_res.get("cast", [])[:5]]
-        director = next((c["name"] for c in creditos_res.get("crew", []) if c["job"] == "Director"), "Desconocido")
-
-        data = {
-            "id": detalle_res.get("id"),
-            "titulo": detalle_res.get("title"),
-            "descripcion": detalle_res.get("overview"),
-            "poster": f"https://image.tmdb.org/t/p/w500{detalle_res.get('poster_path')}" if detalle_res.get("poster_path") else None,
-            "fecha_lanzamiento": detalle_res.get("release_date"),
-            "duracion": detalle_res.get("runtime"),
-            "generos": [g["name"] for g in detalle_res.get("genres", [])],
-            "actores": actores,
-            "director": director,
-        }
-        return Response(data)
+        data = normalize_movie_detail(res.json())
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
+    guardar_con_respaldo(cache_key, data, settings.TMDB_DETALLE_TTL)
+    return Response(data)
+
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@throttle_classes([LimiteTMDb])
 def tmdb_estrenos(request):
-    cache_key = "tmdb_estrenos"
-    cached = cache.get(cache_key)
-    if cached:
-        return Response(cached)
-
-    url = f"{TMDB_BASE_URL}/movie/now_playing"
-    params = {"api_key": TMDB_API_KEY, "language": "es-ES", "page": 1}
-    res = requests.get(url, params=params, timeout=10)
-    if res.status_code == 200:
-        data = res.json()
-        movies = [normalize_movie(m) for m in data.get("results", [])]
-        cache.set(cache_key, movies, 3600)
-        return Response(movies)
-    return Response({"error": "No se pudo obtener"}, status=400)
+    cache_key = "tmdb_estrenos_json"
+    no_modificado = respuesta_304_rapida(request, cache_key)
+    if no_modificado:
+        return no_modificado
+
+    entrada = obtener_swr(
+        cache_key,
+        renderizador(
+            cache_key,
+            lambda: _cargar_lista_local(en_cartelera=True) or _cargar_lista_tmdb("/movie/now_playing", "estrenos"),
+            settings.TMDB_LISTAS_SOFT_TTL,
+        ),
+        settings.TMDB_LISTAS_SOFT_TTL,
+        settings.TMDB_LISTAS_HARD_TTL,
+    )
+    if entrada is None:
+        return Response({"error": "No se pudo obtener"}, status=400)
+    return respuesta_json(request, entrada)
 
 # ============================
 # Favoritos
@@ -239,44 +443,37 @@ def tmdb_estrenos(request):
 @permission_classes([IsAuthenticated])
 def favoritos(request):
     if request.method == "GET":
-        favoritos = Favorito.objects.filter(usuario=request.user).select_related("pelicula")
-        data = [
-            {
-                "id": fav.pk,
-                "movie": normalize_movie_from_model(fav.pelicula),
-            }
-            for fav in favoritos
-        ]
-        return Response(data)
+        favoritos = Favorito.objects.filter(usuario=request.user)
+        if request.GET.get("solo_ids") == "1":
+            return _solo_ids(favoritos)
+
+        favoritos = favoritos.select_related("pelicula").only("id", *CAMPOS_PELICULA_RELACIONADA)
+        return _listado_paginado(
+            request,
+            favoritos,
+            ["-id"],
+            lambda fav: {"id": fav.pk, "movie": normalize_movie_from_model(fav.pelicula)},
+        )
 
     elif request.method == "POST":
-        data = request.data
-        tmdb_id = data.get("tmdb_id") or data.get("id")
-        if not tmdb_id:
+        # Upsert idempotente: dos sentencias, seguro ante peticiones duplicadas concurrentes
+        resultado = colecciones.agregar_uno(Favorito, request.user, request.data)
+        if resultado is None:
             return Response({"error": "Se requiere tmdb_id"}, status=400)
 
-        pelicula, _ = Pelicula.objects.get_or_create(
-            tmdb_id=tmdb_id,
-            defaults={
-                "titulo": data.get("title", ""),
-                "descripcion": data.get("overview", ""),
-                "poster": data.get("poster_path"),
-                "fecha_lanzamiento": data.get("release_date"),
-            },
-        )
-        favorito, created = Favorito.objects.get_or_create(usuario=request.user, pelicula=pelicula)
+        pelicula, favorito_id, _, created = resultado
         if not created:
             return Response(
                 {
                     "mensaje": "Ya estaba en favoritos",
-                    "id": favorito.pk,
+                    "id": favorito_id,
                     "movie": normalize_movie_from_model(pelicula),
                 },
                 status=200,
             )
 
         return Response(
-            {"id": favorito.pk, "movie": normalize_movie_from_model(pelicula)},
+            {"id": favorito_id, "movie": normalize_movie_from_model(pelicula)},
             status=201,
         )
 
@@ -305,46 +502,43 @@ def favorito_detalle(request, pk):
 @permission_classes([IsAuthenticated])
 def vistos(request):
     if request.method == "GET":
-        vistos = Visto.objects.filter(usuario=request.user).select_related("pelicula")
-        data = [
-            {
+        vistos = Visto.objects.filter(usuario=request.user)
+        if request.GET.get("solo_ids") == "1":
+            return _solo_ids(vistos)
+
+        vistos = vistos.select_related("pelicula").only(
+            "id", "calificacion", "fecha_visto", *CAMPOS_PELICULA_RELACIONADA
+        )
+        return _listado_paginado(
+            request,
+            vistos,
+            ["-fecha_visto", "-id"],
+            lambda v: {
                 "id": v.pk,
                 "movie": normalize_movie_from_model(v.pelicula),
                 "calificacion": getattr(v, "calificacion", None),
-            }
-            for v in vistos
-        ]
-        return Response(data)
+            },
+        )
 
     elif request.method == "POST":
-        data = request.data
-        tmdb_id = data.get("tmdb_id") or data.get("id")
-        if not tmdb_id:
+        resultado = colecciones.agregar_uno(Visto, request.user, request.data)
+        if resultado is None:
             return Response({"error": "Se requiere tmdb_id"}, status=400)
 
-        pelicula, _ = Pelicula.objects.get_or_create(
-            tmdb_id=tmdb_id,
-            defaults={
-                "titulo": data.get("title", ""),
-                "descripcion": data.get("overview", ""),
-                "poster": data.get("poster_path"),
-                "fecha_lanzamiento": data.get("release_date"),
-            },
-        )
-        visto, created = Visto.objects.get_or_create(usuario=request.user, pelicula=pelicula)
+        pelicula, visto_id, calificacion, created = resultado
         if not created:
             return Response(
                 {
                     "mensaje": "Ya estaba en vistos",
-                    "id": visto.pk,
+                    "id": visto_id,
                     "movie": normalize_movie_from_model(pelicula),
-                    "calificacion": getattr(visto, "calificacion", None),
+                    "calificacion": calificacion,
                 },
                 status=200,
             )
 
         return Response(
-            {"id": visto.pk, "movie": normalize_movie_from_model(pelicula), "calificacion": None},
+            {"id": visto_id, "movie": normalize_movie_from_model(pelicula), "calificacion": None},
             status=201,
         )
 
@@ -370,7 +564,9 @@ def visto_detalle(request, pk):
         cal = request.data.get("calificacion")
         if cal is not None:
             try:
-                visto.calificacion = float(cal)
+                # IntegerField: se guarda el entero (como antes al truncar la BD)
+                # y las señales ajustan las estadísticas con ese mismo valor
+                visto.calificacion = int(float(cal))
                 visto.save()
             except Exception:
                 return Response({"error": "Calificación inválida"}, status=400)
@@ -387,6 +583,46 @@ def visto_detalle(request, pk):
         visto.delete()
         return Response({"mensaje": "Marcado como visto eliminado"}, status=204)
 
+# ============================
+# Favoritos / Vistos en lote
+# ============================
+
+def _coleccion_bulk(request, modelo):
+    """
+    POST {"items": [payload TMDb, ...]}: alta masiva con estado por item.
+    DELETE {"ids": [pk, ...]}: baja masiva por id de Favorito/Visto.
+    """
+    clave = "items" if request.method == "POST" else "ids"
+    valores = request.data.get(clave) if isinstance(request.data, dict) else None
+    if not isinstance(valores, list) or not valores:
+        return Response({"error": f"Se requiere una lista '{clave}'"}, status=400)
+    if len(valores) > settings.COLECCIONES_BULK_MAXIMO:
+        return Response({"error": f"Máximo {settings.COLECCIONES_BULK_MAXIMO} elementos por petición"}, status=400)
+
+    if request.method == "POST":
+        resultados = colecciones.agregar(modelo, request.user, valores)
+        creados = sum(1 for r in resultados if r["estado"] == colecciones.CREADO)
+        return Response({"results": resultados, "creados": creados}, status=201 if creados else 200)
+
+    try:
+        ids = [int(i) for i in valores]
+    except (TypeError, ValueError):
+        return Response({"error": "Los ids deben ser enteros"}, status=400)
+    eliminados, no_encontrados = colecciones.eliminar(modelo, request.user, ids)
+    return Response({"eliminados": eliminados, "no_encontrados": no_encontrados})
+
+
+@api_view(["POST", "DELETE"])
+@permission_classes([IsAuthenticated])
+def favoritos_bulk(request):
+    return _coleccion_bulk(request, Favorito)
+
+
+@api_view(["POST", "DELETE"])
+@permission_classes([IsAuthenticated])
+def vistos_bulk(request):
+    return _coleccion_bulk(request, Visto)
+
 # ============================
 # Update Profile
 # ============================
@@ -401,3 +637,22 @@ def update_profile(request):
         serializer.save()
         return Response({"mensaje": "Perfil actualizado", "usuario": UsuarioSerializer(user).data})
     return Response(serializer.errors, status=400)
+
+# ============================
+# Métricas (solo staff)
+# ============================
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def ver_metricas(request):
+    """
+    Métricas del worker que atiende la petición (cada proceso lleva las suyas;
+    `pid` indica cuál) y los contadores compartidos entre workers.
+    """
+    if not request.user.is_staff:
+        return Response({"error": "Solo administradores pueden ver las métricas"}, status=403)
+    return Response({
+        "pid": os.getpid(),
+        "worker": metricas.snapshot(),
+        "compartidas": metricas.leer_compartidos(),
+    })
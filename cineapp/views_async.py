@@ -0,0 +1,202 @@
+# cineapp/views_async.py
+# Versiones async de las vistas tmdb_* para el modo ASGI (cinehub_project/asgi.py).
+# Mismas respuestas que cineapp/views.py, pero las llamadas a TMDb no bloquean
+# un hilo: un worker atiende cientos de peticiones en vuelo.
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from . import autocompletado, tmdb_client
+from .busqueda import buscar_local, paginas
+from .cache_utils import (
+    acache, aguardar_con_respaldo, aobtener_coalescido, aobtener_respaldo, aobtener_swr, en_hilo,
+)
+from .respuestas import arenderizador, arespuesta_304_rapida, respuesta_json
+from .throttling import limitar
+from .views import (
+    NO_ENCONTRADA, _cargar_lista_local, normalize_movie, normalize_movie_detail,
+    normalize_movie_from_model,
+)
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={"ensure_ascii": False})
+
+
+# ============================
+# Helpers
+# ============================
+
+def _limitado(vista):
+    """Mismo límite que LimiteTMDb en las vistas DRF: 429 con Retry-After si se supera."""
+    @functools.wraps(vista)
+    async def envoltura(request, *args, **kwargs):
+        espera = await en_hilo(limitar)(request, "tmdb")
+        if espera:
+            respuesta = _json({"detail": f"Demasiadas peticiones. Reintenta en {espera} segundos."}, status=429)
+            respuesta["Retry-After"] = str(espera)
+            return respuesta
+        return await vista(request, *args, **kwargs)
+    return envoltura
+
+
+async def _acargar_lista_tmdb(path, endpoint):
+    try:
+        res = await tmdb_client.aget(path, {"page": 1}, endpoint=endpoint)
+    except tmdb_client.TMDbError:
+        return None
+    if res.status_code != 200:
+        return None
+    return [normalize_movie(m) for m in res.json().get("results", [])]
+
+
+async def _acargar_busqueda_tmdb(query, page):
+    try:
+        res = await tmdb_client.aget("/search/movie", {"query": query, "page": page}, endpoint="buscar")
+    except tmdb_client.TMDbError:
+        return None
+    if res.status_code != 200:
+        return None
+    data = res.json()
+    return {
+        "results": [normalize_movie(m) for m in data.get("results", [])],
+        "total_pages": data.get("total_pages", 1),
+        "total_results": data.get("total_results", 0),
+        "page": int(page),
+    }
+
+
+def _buscar_local(query, page):
+    peliculas, total = buscar_local(query, page)
+    return [normalize_movie_from_model(p) for p in peliculas], total
+
+
+# ============================
+# TMDb - Populares, Buscar, Detalle, Estrenos
+# ============================
+
+@require_GET
+@_limitado
+async def tmdb_populares(request):
+    async def acargar():
+        return await sync_to_async(_cargar_lista_local)() or await _acargar_lista_tmdb("/movie/popular", "populares")
+
+    cache_key = "tmdb_populares_json"
+    no_modificado = await arespuesta_304_rapida(request, cache_key)
+    if no_modificado:
+        return no_modificado
+
+    entrada = await aobtener_swr(
+        cache_key,
+        arenderizador(cache_key, acargar, settings.TMDB_LISTAS_SOFT_TTL),
+        settings.TMDB_LISTAS_SOFT_TTL,
+        settings.TMDB_LISTAS_HARD_TTL,
+    )
+    if entrada is None:
+        return _json({"error": "No se pudo obtener"}, status=400)
+    return respuesta_json(request, entrada)
+
+
+@require_GET
+@_limitado
+async def tmdb_buscar(request):
+    query = request.GET.get("q", "").strip()
+    page = request.GET.get("page", "1")
+
+    if not query or len(query) < 2:
+        return _json({"error": "Debes enviar ?q con al menos 2 caracteres"}, status=400)
+
+    if settings.BUSQUEDA_LOCAL and page.isdigit() and int(page) >= 1:
+        movies, total = await sync_to_async(_buscar_local)(query, int(page))
+        if total >= settings.BUSQUEDA_LOCAL_MIN_RESULTADOS:
+            return _json({
+                "results": movies,
+                "total_pages": paginas(total),
+                "total_results": total,
+                "page": int(page),
+            })
+
+    cache_key = f"tmdb_search_json_{query.lower()}_{page}"
+    no_modificado = await arespuesta_304_rapida(request, cache_key)
+    if no_modificado:
+        return no_modificado
+
+    entrada = await aobtener_coalescido(
+        cache_key,
+        arenderizador(cache_key, lambda: _acargar_busqueda_tmdb(query, page), settings.TMDB_BUSCAR_TTL),
+        settings.TMDB_BUSCAR_TTL,
+        espera_max=settings.TMDB_COALESCENCIA_ESPERA,
+    )
+    if entrada is None:
+        return _json({"error": "No se pudo obtener"}, status=400)
+    return respuesta_json(request, entrada)
+
+
+@require_GET
+@_limitado
+async def tmdb_autocomplete(request):
+    query = request.GET.get("q", "").strip()
+    if len(query) < autocompletado.MIN_PREFIJO:
+        return _json({"error": "Debes enviar ?q con al menos 2 caracteres"}, status=400)
+    return _json({"results": await en_hilo(autocompletado.sugerir)(query)})
+
+
+@require_GET
+@_limitado
+async def tmdb_detalle(request, movie_id):
+    cache_key = f"tmdb_detalle_{movie_id}"
+    cached = await acache.aget(cache_key)
+    if cached == NO_ENCONTRADA:
+        return _json({"error": "Película no encontrada"}, status=404)
+    if cached:
+        return _json(cached)
+
+    try:
+        res = await tmdb_client.aget(f"/movie/{movie_id}", {"append_to_response": "credits"}, endpoint="detalle")
+    except tmdb_client.TMDbError:
+        res = None
+
+    if res is not None and res.status_code == 404:
+        await acache.aset(cache_key, NO_ENCONTRADA, settings.TMDB_NEGATIVO_TTL)
+        return _json({"error": "Película no encontrada"}, status=404)
+    if res is None or res.status_code != 200:
+        respaldo = await aobtener_respaldo(cache_key)
+        if respaldo:
+            return _json(respaldo)
+        return _json({"error": "No se pudo obtener"}, status=400)
+
+    try:
+        data = normalize_movie_detail(res.json())
+    except Exception as e:
+        return _json({"error": str(e)}, status=500)
+
+    await aguardar_con_respaldo(cache_key, data, settings.TMDB_DETALLE_TTL)
+    return _json(data)
+
+
+@require_GET
+@_limitado
+async def tmdb_estrenos(request):
+    async def acargar():
+        return (
+            await sync_to_async(_cargar_lista_local)(en_cartelera=True)
+            or await _acargar_lista_tmdb("/movie/now_playing", "estrenos")
+        )
+
+    cache_key = "tmdb_estrenos_json"
+    no_modificado = await arespuesta_304_rapida(request, cache_key)
+    if no_modificado:
+        return no_modificado
+
+    entrada = await aobtener_swr(
+        cache_key,
+        arenderizador(cache_key, acargar, settings.TMDB_LISTAS_SOFT_TTL),
+        settings.TMDB_LISTAS_SOFT_TTL,
+        settings.TMDB_LISTAS_HARD_TTL,
+    )
+    if entrada is None:
+        return _json({"error": "No se pudo obtener"}, status=400)
+    return respuesta_json(request, entrada)
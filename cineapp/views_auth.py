@@ -1,19 +1,33 @@
 # cineapp/views_auth.py
 from rest_framework import generics, status
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import update_last_login
 from django.utils import timezone
-from datetime import timedelta
+from django.utils.dateparse import parse_date
+from datetime import datetime, time, timedelta
 
-from .models import Usuario, PlanSuscripcion, Suscripcion, HistorialPago
+from .models import Usuario, PlanSuscripcion, HistorialPago
 from .serializers import (
     UsuarioRegisterSerializer, UsuarioSerializer, UsuarioLoginSerializer,
     PlanSuscripcionSerializer, SuscripcionSerializer,
     CrearSuscripcionSerializer, HistorialPagoSerializer
 )
+from .serializers_jwt import EmailTokenObtainPairSerializer, tokens_con_plan
+from .respuestas import obtener_renderizado, respuesta_304_rapida, respuesta_json
+from .signals import CACHE_PLANES
+from . import revocacion, suscripciones
+from .suscripciones import suscripcion_actual
+from .throttling import LimiteLogin
+from .views import _listado_paginado
 
 # =========================
 # Registro
@@ -42,41 +56,67 @@ class RegisterView(generics.CreateAPIView):
 # =========================
 class LoginView(APIView):
     permission_classes = (AllowAny,)
+    throttle_classes = (LimiteLogin,)
     
     def post(self, request):
         serializer = UsuarioLoginSerializer(data=request.data)
-        if serializer.is_valid():
-            email = serializer.validated_data['email']
-            password = serializer.validated_data['password']
-            try:
-                user = Usuario.objects.get(email=email)
-                if user.check_password(password) and user.is_active:
-                    jwt_serializer = EmailTokenObtainPairSerializer(data=request.data)
-                    if jwt_serializer.is_valid():
-                        return Response(jwt_serializer.validated_data, status=status.HTTP_200_OK)
-                return Response({"error": "Credenciales inválidas"}, status=status.HTTP_401_UNAUTHORIZED)
-            except Usuario.DoesNotExist:
-                return Response({"error": "Usuario no encontrado"}, status=status.HTTP_401_UNAUTHORIZED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # Un solo hash por intento: authenticate() verifica la contraseña (y con
+        # un email inexistente hashea igual, así el tiempo no delata qué cuentas
+        # existen) y los tokens se emiten desde ese mismo usuario.
+        user = authenticate(
+            request,
+            email=serializer.validated_data['email'],
+            password=serializer.validated_data['password'],
+        )
+        if user is None:
+            LimiteLogin.registrar_fallo(request)
+            return Response({"error": "Credenciales inválidas"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        refresh = EmailTokenObtainPairSerializer.get_token(user)
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
+        return Response({"refresh": str(refresh), "access": str(refresh.access_token)}, status=status.HTTP_200_OK)
 
 # =========================
 # Logout
 # =========================
 class LogoutView(APIView):
+    """
+    Revoca el refresh enviado ({"refresh": ...}) y el access de la petición.
+    Con {"todos": true} revoca todos los tokens del usuario (todos los dispositivos).
+    """
     permission_classes = (AllowAny,)
     
     def post(self, request):
+        if request.data.get("refresh"):
+            try:
+                revocacion.revocar(RefreshToken(request.data["refresh"]))
+            except TokenError:
+                return Response({"error": "Token inválido"}, status=status.HTTP_400_BAD_REQUEST)
+        if request.auth is not None:
+            revocacion.revocar(request.auth)
+        if request.data.get("todos"):
+            if not request.user.is_authenticated:
+                return Response({"error": "Debes enviar el access token"}, status=status.HTTP_401_UNAUTHORIZED)
+            revocacion.revocar_todos(request.user.pk)
         return Response({"message": "Sesión cerrada exitosamente"}, status=status.HTTP_200_OK)
 
 # =========================
 # JWT con email
 # =========================
-class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
-    username_field = "email"
-
-
 class EmailTokenObtainPairView(TokenObtainPairView):
     serializer_class = EmailTokenObtainPairSerializer
+    throttle_classes = (LimiteLogin,)
+
+    def post(self, request, *args, **kwargs):
+        try:
+            return super().post(request, *args, **kwargs)
+        except AuthenticationFailed:
+            LimiteLogin.registrar_fallo(request)
+            raise
 
 # =========================
 # Perfil
@@ -95,16 +135,23 @@ class PlanesSuscripcionView(APIView):
     permission_classes = [AllowAny]
     
     def get(self, request):
-        planes = PlanSuscripcion.objects.filter(es_activo=True)
-        serializer = PlanSuscripcionSerializer(planes, many=True)
-        return Response(serializer.data)
+        no_modificado = respuesta_304_rapida(request, CACHE_PLANES)
+        if no_modificado:
+            return no_modificado
+
+        entrada = obtener_renderizado(
+            CACHE_PLANES,
+            lambda: PlanSuscripcionSerializer(PlanSuscripcion.objects.filter(es_activo=True), many=True).data,
+            settings.PLANES_CACHE_TTL,
+        )
+        return respuesta_json(request, entrada)
 
 
 class SuscripcionUsuarioView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        suscripcion = Suscripcion.objects.filter(usuario=request.user, estado='activa').first()
+        suscripcion = suscripcion_actual(request.user)
         if suscripcion:
             serializer = SuscripcionSerializer(suscripcion)
             return Response(serializer.data)
@@ -121,22 +168,12 @@ class SuscripcionUsuarioView(APIView):
             except PlanSuscripcion.DoesNotExist:
                 return Response({"error": "Plan no encontrado"}, status=404)
             
-            Suscripcion.objects.filter(usuario=request.user, estado='activa').update(estado='cancelada')
-            fecha_fin = timezone.now() + timedelta(days=30)
-            suscripcion = Suscripcion.objects.create(
-                usuario=request.user,
-                plan=plan,
-                fecha_fin=fecha_fin,
-                metodo_pago=metodo_pago,
-                es_renovacion_automatica=es_renovacion_automatica
+            suscripcion = suscripciones.activar(request.user, plan, metodo_pago, es_renovacion_automatica)
+            # Tokens nuevos con el plan recién activado (los anteriores ya no acreditan plan)
+            return Response(
+                {**SuscripcionSerializer(suscripcion).data, "tokens": tokens_con_plan(request.user, suscripcion)},
+                status=201,
             )
-            HistorialPago.objects.create(
-                suscripcion=suscripcion,
-                monto=plan.precio_mensual,
-                metodo_pago=metodo_pago,
-                transaccion_id=f"TXN_{suscripcion.id}_{timezone.now().timestamp()}"
-            )
-            return Response(SuscripcionSerializer(suscripcion).data, status=201)
         return Response(serializer.errors, status=400)
 
 
@@ -144,19 +181,46 @@ class CancelarSuscripcionView(APIView):
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
-        suscripcion = Suscripcion.objects.filter(usuario=request.user, estado='activa').first()
-        if not suscripcion:
+        if not suscripciones.cancelar(request.user):
             return Response({"error": "No tienes suscripción activa"}, status=404)
-        suscripcion.estado = 'cancelada'
-        suscripcion.save()
-        return Response({"message": "Suscripción cancelada exitosamente"})
+        return Response({
+            "message": "Suscripción cancelada exitosamente",
+            "tokens": tokens_con_plan(request.user, None),
+        })
 
 
 class HistorialPagosView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        suscripciones = Suscripcion.objects.filter(usuario=request.user)
-        pagos = HistorialPago.objects.filter(suscripcion__in=suscripciones).order_by('-fecha_pago')
-        serializer = HistorialPagoSerializer(pagos, many=True)
-        return Response(serializer.data)
+        # ?desde= / ?hasta= (AAAA-MM-DD, ambos inclusive) y paginación por cursor
+        pagos = HistorialPago.objects.filter(suscripcion__usuario=request.user)
+        try:
+            desde = _fecha_param(request, "desde")
+            hasta = _fecha_param(request, "hasta")
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        if desde:
+            pagos = pagos.filter(fecha_pago__gte=_inicio_del_dia(desde))
+        if hasta:
+            pagos = pagos.filter(fecha_pago__lt=_inicio_del_dia(hasta + timedelta(days=1)))
+        return _listado_paginado(
+            request, pagos, ["-fecha_pago", "-id"], lambda pago: HistorialPagoSerializer(pago).data
+        )
+
+
+def _fecha_param(request, nombre):
+    valor = request.GET.get(nombre)
+    if not valor:
+        return None
+    try:
+        fecha = parse_date(valor)
+    except ValueError:
+        fecha = None
+    if fecha is None:
+        raise ValueError(f"{nombre} debe tener formato AAAA-MM-DD")
+    return fecha
+
+
+def _inicio_del_dia(fecha):
+    return timezone.make_aware(datetime.combine(fecha, time.min))
@@ -1,15 +1,26 @@
 # cineapp/views_jwt.py
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers_jwt import EmailTokenObtainPairSerializer
 from .serializers import UsuarioSerializer
-from .models import Visto, Favorito
+from .models import EstadisticasUsuario
+from .throttling import LimiteLogin
 
 # ✅ Login con email (JWT)
 class EmailTokenObtainPairView(TokenObtainPairView):
     serializer_class = EmailTokenObtainPairSerializer
+    throttle_classes = (LimiteLogin,)
+
+    def post(self, request, *args, **kwargs):
+        try:
+            return super().post(request, *args, **kwargs)
+        except AuthenticationFailed:
+            # Credenciales inválidas: cuenta contra los límites por cuenta
+            LimiteLogin.registrar_fallo(request)
+            raise
 
 # ✅ Perfil con métricas
 class ProfileView(APIView):
@@ -17,17 +28,14 @@ class ProfileView(APIView):
 
     def get(self, request):
         serializer = UsuarioSerializer(request.user)
-        vistos = Visto.objects.filter(usuario=request.user)
-        favoritos = Favorito.objects.filter(usuario=request.user)
-        promedio = (
-            round(sum(v.calificacion or 0 for v in vistos) / len(vistos), 1)
-            if len(vistos) > 0 else 0
-        )
+        stats = EstadisticasUsuario.objects.filter(usuario=request.user).first()
+        vistos = stats.vistos if stats else 0
+        promedio = round(stats.suma_calificaciones / vistos, 1) if vistos > 0 else 0
         return Response({
             **serializer.data,
             "stats": {
-                "vistos": len(vistos),
-                "favoritos": len(favoritos),
+                "vistos": vistos,
+                "favoritos": stats.favoritos if stats else 0,
                 "promedioCalificacion": promedio
             }
         })
@@ -0,0 +1,8 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cinehub_project.settings")
+# En modo ASGI las rutas tmdb_* usan las vistas async de cineapp/views_async.py
+os.environ.setdefault("CINEHUB_ASGI", "True")
+
+application = get_asgi_application()
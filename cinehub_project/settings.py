@@ -27,6 +27,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "corsheaders",
     "cineapp",
@@ -64,6 +65,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "cinehub_project.wsgi.application"
+ASGI_APPLICATION = "cinehub_project.asgi.application"
+
+# Con ASGI (cinehub_project/asgi.py) las vistas tmdb_* son async
+TMDB_VISTAS_ASYNC = os.environ.get("CINEHUB_ASGI", "False") == "True"
 
 # ========================
 # Base de datos
@@ -99,23 +104,46 @@ STATIC_URL = "/static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# ========================
+# Respuestas cacheadas
+# ========================
+# Tamaño mínimo (bytes) para guardar también la versión gzip
+RESPUESTA_GZIP_MINIMO = int(os.environ.get("RESPUESTA_GZIP_MINIMO", "1024"))
+# Planes de suscripción (se invalida al guardar un PlanSuscripcion)
+PLANES_CACHE_TTL = int(os.environ.get("PLANES_CACHE_TTL", "86400"))
+# Suscripción activa por usuario (se invalida al confirmar cada cambio)
+SUSCRIPCION_CACHE_TTL = int(os.environ.get("SUSCRIPCION_CACHE_TTL", "300"))
+
+# ========================
+# Paginación por cursor
+# ========================
+PAGINACION_TAMANO = int(os.environ.get("PAGINACION_TAMANO", "50"))
+PAGINACION_MAXIMO = int(os.environ.get("PAGINACION_MAXIMO", "200"))
+# Filas por lote al exportar en streaming (usuarios/exportar/)
+EXPORTACION_LOTE = int(os.environ.get("EXPORTACION_LOTE", "2000"))
+# Elementos por petición en favoritos/bulk/ y vistos/bulk/
+COLECCIONES_BULK_MAXIMO = int(os.environ.get("COLECCIONES_BULK_MAXIMO", "1000"))
+
 # ========================
 # DRF + JWT
 # ========================
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "cineapp.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    # Proxies de confianza delante de gunicorn. Con 0 la IP del cliente es
+    # REMOTE_ADDR y X-Forwarded-For se ignora (lo manda el propio cliente);
+    # detrás de un balanceador poner la cantidad de saltos que añade.
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", "0")),
 }
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=24),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
-    "BLACKLIST_AFTER_ROTATION": True,
     "UPDATE_LAST_LOGIN": True,
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,
@@ -127,12 +155,102 @@ SIMPLE_JWT = {
     "TOKEN_TYPE_CLAIM": "token_type",
     "SLIDING_TOKEN_LIFETIME": timedelta(minutes=5),
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
+    # Recalcula los claims de plan (plan, plan_exp) en cada refresh
+    "TOKEN_REFRESH_SERIALIZER": "cineapp.serializers_jwt.PlanTokenRefreshSerializer",
+}
+
+# Usuario del token cacheado (cineapp/authentication.py): Redis y LRU por proceso
+AUTENTICACION_CACHE_TTL = int(os.environ.get("AUTENTICACION_CACHE_TTL", "300"))
+AUTENTICACION_CACHE_LOCAL_TTL = int(os.environ.get("AUTENTICACION_CACHE_LOCAL_TTL", "5"))
+AUTENTICACION_CACHE_LOCAL_MAXIMO = int(os.environ.get("AUTENTICACION_CACHE_LOCAL_MAXIMO", "1024"))
+
+# ========================
+# Límites de peticiones (cineapp/throttling.py)
+# ========================
+# Por ámbito y dimensión, una lista "cantidad/periodo" separada por comas: la
+# ventana corta es la ráfaga permitida y la larga el ritmo sostenido. Vacío =
+# sin límite en esa dimensión. `usuario` e `ip` cuentan sobre todas las rutas
+# del ámbito; `ruta`, todo el tráfico de cada ruta. En el login, `cuenta_ip`
+# (email + IP) y `cuenta` (email desde cualquier IP) cuentan solo los intentos
+# fallidos.
+LIMITES_ACTIVOS = os.environ.get("LIMITES_ACTIVOS", "True") == "True"
+LIMITES_PETICIONES = {
+    "login": {
+        "ip": os.environ.get("LIMITE_LOGIN_IP", "5/s,30/min"),
+        "cuenta_ip": os.environ.get("LIMITE_LOGIN_CUENTA_IP", "5/min,20/hour"),
+        "cuenta": os.environ.get("LIMITE_LOGIN_CUENTA", "100/hour"),
+        "ruta": os.environ.get("LIMITE_LOGIN_RUTA", ""),
+    },
+    "tmdb": {
+        "usuario": os.environ.get("LIMITE_TMDB_USUARIO", "20/s,600/min"),
+        "ip": os.environ.get("LIMITE_TMDB_IP", "40/s,1200/min"),
+        "ruta": os.environ.get("LIMITE_TMDB_RUTA", ""),
+    },
 }
 
 # ========================
 # TMDB
 # ========================
 TMDB_API_KEY = os.environ.get("TMDB_API_KEY", "")
+# Solo se cambia para apuntar a un stub (benchmarks/asgi_vs_wsgi.py)
+TMDB_BASE_URL = os.environ.get("TMDB_BASE_URL", "https://api.themoviedb.org/3")
+
+# Pool de conexiones por worker
+TMDB_POOL_CONNECTIONS = int(os.environ.get("TMDB_POOL_CONNECTIONS", "4"))
+TMDB_POOL_MAXSIZE = int(os.environ.get("TMDB_POOL_MAXSIZE", "20"))
+# Conexiones simultáneas del cliente async (modo ASGI)
+TMDB_ASYNC_MAX_CONEXIONES = int(os.environ.get("TMDB_ASYNC_MAX_CONEXIONES", "200"))
+
+# Timeouts (connect, read) en segundos por endpoint
+TMDB_TIMEOUTS = {
+    "default": (3.05, 10),
+    "populares": (3.05, 8),
+    "estrenos": (3.05, 8),
+    "buscar": (3.05, 5),
+    "detalle": (3.05, 6),
+    "catalogo": (3.05, 15),
+}
+
+# Reintentos ante 429/5xx con backoff exponencial + jitter
+TMDB_RETRY_TOTAL = int(os.environ.get("TMDB_RETRY_TOTAL", "2"))
+TMDB_RETRY_BACKOFF = float(os.environ.get("TMDB_RETRY_BACKOFF", "0.3"))
+TMDB_RETRY_JITTER = float(os.environ.get("TMDB_RETRY_JITTER", "0.2"))
+
+# Cache del detalle de película (segundos) y cache negativo para ids inexistentes
+TMDB_DETALLE_TTL = int(os.environ.get("TMDB_DETALLE_TTL", "21600"))
+TMDB_NEGATIVO_TTL = int(os.environ.get("TMDB_NEGATIVO_TTL", "300"))
+
+# Circuit breaker por familia de endpoints: fallos dentro de la ventana que lo
+# abren y segundos que permanece abierto antes de probar con una sonda
+TMDB_CIRCUITO_UMBRAL = int(os.environ.get("TMDB_CIRCUITO_UMBRAL", "5"))
+TMDB_CIRCUITO_VENTANA = int(os.environ.get("TMDB_CIRCUITO_VENTANA", "30"))
+TMDB_CIRCUITO_ENFRIAMIENTO = int(os.environ.get("TMDB_CIRCUITO_ENFRIAMIENTO", "30"))
+
+# Último valor bueno que se sirve mientras TMDb no responde
+CACHE_RESPALDO_TTL = int(os.environ.get("CACHE_RESPALDO_TTL", "259200"))
+
+# Populares / estrenos: pasado el TTL suave se refresca en segundo plano,
+# el TTL duro es lo máximo que se sirve un valor viejo
+TMDB_LISTAS_SOFT_TTL = int(os.environ.get("TMDB_LISTAS_SOFT_TTL", "3600"))
+TMDB_LISTAS_HARD_TTL = int(os.environ.get("TMDB_LISTAS_HARD_TTL", "21600"))
+
+# Servir populares/estrenos desde el espejo local de Pelicula cuando exista
+TMDB_CATALOGO_LOCAL = os.environ.get("TMDB_CATALOGO_LOCAL", "False") == "True"
+
+# Búsqueda local (full-text + trigram sobre Pelicula); se usa TMDb si hay menos
+# coincidencias locales que BUSQUEDA_LOCAL_MIN_RESULTADOS (latencia medida con
+# benchmarks/busqueda_local.py).
+BUSQUEDA_LOCAL = os.environ.get("BUSQUEDA_LOCAL", "True") == "True"
+BUSQUEDA_LOCAL_MIN_RESULTADOS = int(os.environ.get("BUSQUEDA_LOCAL_MIN_RESULTADOS", "5"))
+# Máximo de coincidencias (las más populares) que se rankean y paginan por búsqueda
+BUSQUEDA_LOCAL_CANDIDATOS = int(os.environ.get("BUSQUEDA_LOCAL_CANDIDATOS", "1000"))
+
+# Autocompletado: películas guardadas por prefijo en el índice de Redis
+AUTOCOMPLETADO_MAX_POR_PREFIJO = int(os.environ.get("AUTOCOMPLETADO_MAX_POR_PREFIJO", "10"))
+
+# Búsqueda: cuánto espera un miss a que otro worker traiga el mismo resultado
+TMDB_BUSCAR_TTL = int(os.environ.get("TMDB_BUSCAR_TTL", "1800"))
+TMDB_COALESCENCIA_ESPERA = float(os.environ.get("TMDB_COALESCENCIA_ESPERA", "5"))
 
 # ========================
 # CORS